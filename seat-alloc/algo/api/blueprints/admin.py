@@ -2,6 +2,7 @@
 # Handles user login/signup and provides utilities for bulk database table operations.
 from flask import Blueprint, jsonify, request, send_file, current_app
 from algo.database.db import get_db_connection
+from algo.database.queries.session_queries import invalidate_session_cache
 from algo.services.auth_service import token_required, login as auth_login, signup as auth_signup, google_auth_handler, get_user_by_token, get_user_by_id, update_user_profile, VALID_ROLES, role_required
 import sqlite3
 
@@ -93,11 +94,10 @@ def update_profile():
         username = data.get('username')
         email = data.get('email')
 
-        success, message = update_user_profile(user_id, username, email)
-        
+        success, message, user = update_user_profile(user_id, username, email)
+
         if success:
-            # Fetch updated user data
-            user = get_user_by_id(user_id)
+            # Updated row comes back from the UPDATE itself — no second SELECT
             return jsonify({
                 "status": "success",
                 "message": message,
@@ -467,26 +467,38 @@ def reset_data():
         user_id = request.user_id
         conn = get_db_connection()
         cur = conn.cursor()
-        # Order matters for FK
-        tables = ['allocations', 'students', 'uploads', 'allocation_sessions', 'allocation_history', 'feedback']
-        
-        for t in tables:
-            # User isolation deletion
-            if t == 'allocation_sessions':
-                cur.execute(f"DELETE FROM {t} WHERE user_id = ?", (user_id,))
-            elif t == 'uploads':
-                cur.execute(f"DELETE FROM {t} WHERE session_id IN (SELECT session_id FROM allocation_sessions WHERE user_id = ?)", (user_id,))
-            elif t == 'students':
-                cur.execute(f"DELETE FROM {t} WHERE upload_id IN (SELECT u.id FROM uploads u JOIN allocation_sessions s ON u.session_id = s.session_id WHERE s.user_id = ?)", (user_id,))
-            elif t == 'allocations':
-                cur.execute(f"DELETE FROM {t} WHERE session_id IN (SELECT session_id FROM allocation_sessions WHERE user_id = ?)", (user_id,))
-            elif t == 'allocation_history':
-                cur.execute(f"DELETE FROM {t} WHERE session_id IN (SELECT session_id FROM allocation_sessions WHERE user_id = ?)", (user_id,))
-            elif t == 'feedback':
-                cur.execute(f"DELETE FROM {t} WHERE user_id = ?", (user_id,))
-            
-        conn.commit()
-        conn.close()
+        try:
+            # Take the write lock up front so the six deletes commit as one
+            # transaction with a single WAL fsync
+            cur.execute("BEGIN IMMEDIATE")
+            # Order matters for FK
+            tables = ['allocations', 'students', 'uploads', 'allocation_sessions', 'allocation_history', 'feedback']
+
+            for t in tables:
+                # User isolation deletion
+                if t == 'allocation_sessions':
+                    cur.execute(f"DELETE FROM {t} WHERE user_id = ?", (user_id,))
+                elif t == 'uploads':
+                    cur.execute(f"DELETE FROM {t} WHERE session_id IN (SELECT session_id FROM allocation_sessions WHERE user_id = ?)", (user_id,))
+                elif t == 'students':
+                    cur.execute(f"DELETE FROM {t} WHERE upload_id IN (SELECT u.id FROM uploads u JOIN allocation_sessions s ON u.session_id = s.session_id WHERE s.user_id = ?)", (user_id,))
+                elif t == 'allocations':
+                    cur.execute(f"DELETE FROM {t} WHERE session_id IN (SELECT session_id FROM allocation_sessions WHERE user_id = ?)", (user_id,))
+                elif t == 'allocation_history':
+                    cur.execute(f"DELETE FROM {t} WHERE session_id IN (SELECT session_id FROM allocation_sessions WHERE user_id = ?)", (user_id,))
+                elif t == 'feedback':
+                    cur.execute(f"DELETE FROM {t} WHERE user_id = ?", (user_id,))
+
+            conn.commit()
+            invalidate_session_cache()
+        except Exception as db_err:
+            # Roll back so the pooled connection goes back clean — a failure
+            # mid-delete must not leave the write lock held or half-finished
+            # deletes pending for the next request on this thread
+            conn.rollback()
+            raise db_err
+        finally:
+            conn.close()
         return jsonify({"status": "success", "message": "User data cleared"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -5,15 +5,81 @@ from algo.core.cache.cache_manager import CacheManager
 from algo.core.algorithm.seating import SeatingAlgorithm
 from algo.utils.helpers import parse_str_dict, parse_int_dict
 from algo.database.db import get_db_connection
+from algo.database.queries.session_queries import invalidate_session_cache
 from algo.services.auth_service import token_required
 import uuid
 import sqlite3
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from multiprocessing import get_context
 
 allocation_bp = Blueprint('allocations', __name__, url_prefix='/api')
 
 # Module-level singleton — avoid re-instantiating per request
 CACHE_MGR = CacheManager()
 
+# Seating generation is CPU-bound and holds the GIL, so running it inline
+# blocks the Flask worker for the whole request. A small process pool lets
+# generation scale across cores while the worker stays free; created lazily
+# so importing the blueprint (e.g. in tests) never spawns workers.
+_ALGO_POOL = None
+
+# Ceiling on one pool run before the request falls back to in-process
+# execution — a wedged worker must not hang the request forever
+_ALGO_POOL_TIMEOUT = 120  # seconds
+
+
+def _get_algo_pool():
+    global _ALGO_POOL
+    if _ALGO_POOL is None:
+        # spawn, not fork: by the time the first request arrives create_app
+        # has already started the activity-writer thread and the logging
+        # QueueListener, and forking a multi-threaded process can hand the
+        # child a copy of a held lock that never unlocks
+        _ALGO_POOL = ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            mp_context=get_context('spawn'),
+        )
+    return _ALGO_POOL
+
+
+def _run_seating_algorithm(algo_kwargs):
+    """
+    Build and run a SeatingAlgorithm from plain kwargs.
+    Top-level so it is picklable for the process pool.
+    Returns (web_format, is_valid, errors, init_errors).
+    """
+    algo = SeatingAlgorithm(**algo_kwargs)
+    algo.generate_seating()
+    web = algo.to_web_format()
+    ok, errors = algo.validate_constraints()
+    return web, ok, errors, algo.init_errors
+
+
+# "12-3, 4-7, ..." broken-seat strings: one findall in C replaces the
+# per-token split/strip/int loop
+_BROKEN_SEAT_RE = re.compile(r'(\d+)\s*-\s*(\d+)')
+
+
+def _parse_broken_seat_str(broken_str):
+    """Parse a '1-based row-col, ...' string into 0-based (row, col) tuples."""
+    return [(int(r) - 1, int(c) - 1) for r, c in _BROKEN_SEAT_RE.findall(broken_str)]
+
+
+def _run_seating_offloaded(algo_kwargs):
+    """Run the algorithm in the process pool, falling back to in-process."""
+    try:
+        return _get_algo_pool().submit(_run_seating_algorithm, algo_kwargs).result(
+            timeout=_ALGO_POOL_TIMEOUT
+        )
+    except FuturesTimeoutError:
+        print(f"⚠️ Process pool run exceeded {_ALGO_POOL_TIMEOUT}s, running algorithm in-process")
+        return _run_seating_algorithm(algo_kwargs)
+    except Exception as pool_err:
+        print(f"⚠️ Process pool unavailable, running algorithm in-process: {pool_err}")
+        return _run_seating_algorithm(algo_kwargs)
+
 # ============================================================================
 # HELPER: Get pending students for a session (delegates to query layer)
 # ============================================================================
@@ -103,6 +169,7 @@ def generate_seating():
                             UPDATE allocation_sessions SET user_id = ? WHERE session_id = ?
                         """, (request.user_id, session_id))
                         conn.commit()
+                        invalidate_session_cache()
             elif owner_id != request.user_id:
                 conn.close()
                 return jsonify({"error": "Unauthorized session"}), 403
@@ -152,34 +219,40 @@ def generate_seating():
             
             print(f"📋 Filtered: {len(filtered_students)} / {len(pending_students)} pending")
             
-            # Group by batch name
+            # Group by batch name, column-wise (parallel lists instead of one
+            # dict per student) — per-student dicts are only materialized below
+            # for the batches that were actually selected
             batch_groups = {}
             for student in filtered_students:
                 batch_name = student.get('batch_name') or 'Unknown'
-                if batch_name not in batch_groups:
-                    batch_groups[batch_name] = {
-                        'students': [],
+                group = batch_groups.get(batch_name)
+                if group is None:
+                    group = batch_groups[batch_name] = {
+                        'rolls': [],
+                        'names': [],
+                        'semesters': [],
                         'color': student.get('batch_color', '#3b82f6')
                     }
-                
-                batch_groups[batch_name]['students'].append({
-                    'roll': student.get('enrollment'),
-                    'name': student.get('name', ''),
-                    'semester': student.get('semester', 'I')
-                })
-            
+
+                group['rolls'].append(student.get('enrollment'))
+                group['names'].append(student.get('name', ''))
+                group['semesters'].append(student.get('semester', 'I'))
+
             # Convert to algorithm format (1-indexed)
             batch_colors_from_payload = data.get("batch_colors", {})
             if batch_colors_from_payload:
                 batch_colors_from_payload = {int(k): v for k, v in batch_colors_from_payload.items()}
-            
+
             for idx, batch_name in enumerate(selected_batch_names, start=1):
                 if batch_name in batch_groups:
-                    students_list = batch_groups[batch_name]['students']
-                    counts[idx] = len(students_list)
+                    group = batch_groups[batch_name]
+                    counts[idx] = len(group['rolls'])
                     labels[idx] = batch_name
-                    rolls[idx] = students_list
-                    colors[idx] = batch_groups[batch_name]['color']
+                    rolls[idx] = [
+                        {'roll': r, 'name': n, 'semester': s}
+                        for r, n, s in zip(group['rolls'], group['names'], group['semesters'])
+                    ]
+                    colors[idx] = group['color']
                 else:
                     print(f"⚠️ Batch '{batch_name}' has no pending students")
                     counts[idx] = 0
@@ -212,14 +285,7 @@ def generate_seating():
         
         if broken_str:
             if isinstance(broken_str, str) and broken_str.strip():
-                for seat_str in broken_str.split(","):
-                    seat_str = seat_str.strip()
-                    if "-" in seat_str:
-                        try:
-                            r, c = seat_str.split("-")
-                            broken_seats.append((int(r) - 1, int(c) - 1))
-                        except (ValueError, IndexError):
-                            pass
+                broken_seats = _parse_broken_seat_str(broken_str)
             elif isinstance(broken_str, list):
                 for seat in broken_str:
                     if isinstance(seat, (list, tuple)) and len(seat) == 2:
@@ -260,8 +326,8 @@ def generate_seating():
         except Exception as cache_lookup_err:
             print(f"⚠️ Cache info retrieval failed: {cache_lookup_err}")
 
-        # Initialize algorithm
-        algo = SeatingAlgorithm(
+        # Run algorithm off the request thread (kwargs are plain data → picklable)
+        algo_kwargs = dict(
             rows=int(data.get("rows", 10)),
             cols=int(data.get("cols", 6)),
             num_batches=num_batches,
@@ -279,10 +345,7 @@ def generate_seating():
             serial_width=int(data.get("serial_width", 0)),
             allow_adjacent_same_batch=bool(data.get("allow_adjacent_same_batch", False))
         )
-
-        # Generate seating
-        algo.generate_seating()
-        web = algo.to_web_format()
+        web, ok, errors, init_errors = _run_seating_offloaded(algo_kwargs)
 
         # Add metadata
         web.setdefault("metadata", {})
@@ -290,13 +353,10 @@ def generate_seating():
         web["session_id"] = session_id
         web["pending_count"] = total_pending
         web["selected_batches"] = selected_batch_names
-        
-        # Validate
-        ok, errors = algo.validate_constraints()
-        
+
         # Merge init_errors into validation errors for visibility
-        if algo.init_errors:
-            errors = algo.init_errors + errors
+        if init_errors:
+            errors = init_errors + errors
             ok = False # Critical initialization errors should invalidate the plan
             
         web["validation"] = {"is_valid": ok, "errors": errors}
@@ -385,15 +445,7 @@ def manual_generate_seating():
         broken_seats = []
         broken_str = data.get("broken_seats", "")
         if isinstance(broken_str, str) and "-" in broken_str:
-            parts = [p.strip() for p in broken_str.split(',') if p.strip()]
-            for part in parts:
-                if '-' in part:
-                    try:
-                        row_col = part.split('-')
-                        row = int(row_col[0].strip()) - 1
-                        col = int(row_col[1].strip()) - 1
-                        broken_seats.append((row, col))
-                    except: pass
+            broken_seats = _parse_broken_seat_str(broken_str)
         elif isinstance(broken_str, list):
             broken_seats = broken_str
 
@@ -491,6 +543,7 @@ def reset_allocation():
             WHERE session_id = ? AND user_id = ?
         """, (session_id, request.user_id))
         conn.commit()
+        invalidate_session_cache()
         conn.close()
         return jsonify({"status": "success", "message": "Allocations reset"}), 200
     except Exception as e:
@@ -1,14 +1,47 @@
 # Classroom management endpoints.
 # Handles CRUD operations for rooms and their specific row/column/broken-seat configurations.
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
+import hashlib
 import sqlite3
 import json
+import threading
+import orjson
 from algo.config.settings import Config
 from algo.database.db import get_db_connection
 from algo.services.auth_service import token_required
 
 classrooms_bp = Blueprint('classrooms', __name__, url_prefix='/api/classrooms')
 
+# Classroom listings change rarely but are fetched constantly, so the GET
+# response bytes are cached per user behind a version counter. Any write
+# (add/update/delete/claim) bumps the version, which invalidates every entry.
+# The counter only memoizes serialization within this process; the ETag is
+# derived from the body content below, since per-process counters from
+# different gunicorn workers aren't comparable.
+_classrooms_cache = {}  # (user_id, version) -> serialized JSON bytes
+_classrooms_version = 0
+_classrooms_cache_lock = threading.Lock()
+
+# Explicit column order shared by the listing query and its row-to-dict zip;
+# keeps the payload stable if the table ever grows internal columns
+CLASSROOM_COLUMNS = (
+    'id', 'user_id', 'name', 'rows', 'cols', 'broken_seats',
+    'block_width', 'block_structure', 'created_at', 'updated_at'
+)
+
+
+def _classrooms_etag(body):
+    """Weak ETag from a hash of the serialized listing bytes."""
+    return f'W/"classrooms-{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _bump_classrooms_version():
+    """Invalidate all cached classroom listings (write-through invalidation)."""
+    global _classrooms_version
+    with _classrooms_cache_lock:
+        _classrooms_version += 1
+        _classrooms_cache.clear()
+
 
 def auto_convert_block_structure(classroom: dict) -> dict:
     """
@@ -74,26 +107,44 @@ def get_classrooms():
     """List classrooms for current user + unassigned classrooms"""
     try:
         user_id = getattr(request, 'user_id', None)
-        
+
+        cache_key = (user_id, _classrooms_version)
+        cached = _classrooms_cache.get(cache_key)
+        if cached is not None:
+            # Weak ETag from the body hash: content-derived, so a validator
+            # minted by one gunicorn worker is honored correctly by any other
+            # (per-process version counters aren't comparable across workers)
+            etag = _classrooms_etag(cached)
+            if request.headers.get('If-None-Match') == etag:
+                return Response(status=304, headers={'ETag': etag})
+            return Response(cached, mimetype='application/json', headers={'ETag': etag}), 200
+
         conn = get_db_connection()
-        conn.row_factory = sqlite3.Row
         cur = conn.cursor()
-        
+
         # Get user's classrooms AND unassigned classrooms (user_id IS NULL)
         # This ensures existing classrooms created before user isolation are still visible
-        cur.execute("""
-            SELECT * FROM classrooms 
+        cur.execute(f"""
+            SELECT {', '.join(CLASSROOM_COLUMNS)} FROM classrooms
             WHERE user_id = ? OR user_id IS NULL
             ORDER BY name ASC
         """, (user_id,))
-        rows = cur.fetchall()
-        
-        # Apply auto-conversion for each classroom
-        classrooms = [auto_convert_block_structure(dict(row)) for row in rows]
+
+        # Plain tuples + one zip per row — skips the sqlite3.Row wrapper
+        # and the extra dict(row) copy per record
+        classrooms = [
+            auto_convert_block_structure(dict(zip(CLASSROOM_COLUMNS, row)))
+            for row in cur
+        ]
         conn.close()
-        
-        # Return array directly (legacy compatible)
-        return jsonify(classrooms), 200
+
+        # Store pre-serialized bytes; returns array directly (legacy compatible)
+        body = orjson.dumps(classrooms)
+        _classrooms_cache[cache_key] = body
+        etag = _classrooms_etag(body)
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=304, headers={'ETag': etag})
+        return Response(body, mimetype='application/json', headers={'ETag': etag}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -151,7 +202,8 @@ def add_classroom():
         cid = cur.lastrowid
         conn.commit()
         conn.close()
-        
+        _bump_classrooms_version()
+
         return jsonify({"status": "success", "id": cid, "message": "Classroom added"}), 201
     except sqlite3.IntegrityError:
         return jsonify({"status": "error", "message": "Classroom name exists"}), 400
@@ -183,6 +235,7 @@ def delete_classroom(room_id):
         cur.execute("DELETE FROM classrooms WHERE id = ?", (room_id,))
         conn.commit()
         conn.close()
+        _bump_classrooms_version()
         return jsonify({"status": "success", "message": "Deleted"}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -269,7 +322,8 @@ def update_classroom(room_id):
          cur.execute(query, values)
          conn.commit()
          conn.close()
-         
+         _bump_classrooms_version()
+
          return jsonify({"status": "success", "message": "Updated"}), 200
     except Exception as e:
          return jsonify({"status": "error", "message": str(e)}), 500
@@ -298,6 +352,7 @@ def claim_unassigned_classrooms():
         claimed_count = cur.rowcount
         conn.commit()
         conn.close()
+        _bump_classrooms_version()
         
         print(f"📝 User {user_id} claimed {claimed_count} unassigned classroom(s)")
         
@@ -6,6 +6,7 @@ Provides alternative paths for session operations used by Database Manager UI.
 
 from flask import Blueprint, jsonify, request
 from algo.api.blueprints.sessions import deleteSession, getActiveSession, _get_conn
+from algo.database.queries.session_queries import invalidate_session_cache
 import sqlite3
 
 database_bp = Blueprint('database', __name__, url_prefix='/api/database')
@@ -59,19 +60,32 @@ def clear_all_sessions():
     
     try:
         conn = _get_conn()
-        cur = conn.cursor()
-        
-        cur.execute("DELETE FROM allocations")
-        cur.execute("DELETE FROM allocation_history")
-        cur.execute("DELETE FROM students")
-        cur.execute("DELETE FROM uploads")
-        cur.execute("DELETE FROM allocation_sessions")
-        
-        conn.commit()
-        conn.close()
-        
+        try:
+            # One script, one parse, one transaction, one fsync; also resets the
+            # AUTOINCREMENT counters for the cleared tables
+            conn.executescript("""
+                BEGIN IMMEDIATE;
+                DELETE FROM allocations;
+                DELETE FROM allocation_history;
+                DELETE FROM students;
+                DELETE FROM uploads;
+                DELETE FROM allocation_sessions;
+                DELETE FROM sqlite_sequence
+                WHERE name IN ('allocations', 'allocation_history', 'students', 'uploads', 'allocation_sessions');
+                COMMIT;
+            """)
+            invalidate_session_cache()
+        except Exception as db_err:
+            # A failure mid-script leaves the explicit transaction open on the
+            # pooled connection — roll it back so the write lock and partial
+            # deletes don't leak into the next request on this thread
+            conn.rollback()
+            raise db_err
+        finally:
+            conn.close()
+
         return jsonify({"success": True, "message": "All sessions cleared"}), 200
-        
+
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -1,13 +1,74 @@
+import hashlib
 import logging
+import os
 import sqlite3
+import threading
 from datetime import datetime
-from flask import Blueprint, request, jsonify, current_app
+from pathlib import Path
+import orjson
+from flask import Blueprint, request, jsonify, current_app, Response, send_file
 from algo.database.db import get_db_connection
 from algo.services.auth_service import token_required
 
 feedback_bp = Blueprint('feedback', __name__)
 logger = logging.getLogger(__name__)
 
+# Upper bound on page size so a single request can't drag the whole table into memory
+MAX_PAGE_SIZE = 500
+DEFAULT_PAGE_SIZE = 100
+
+
+def _json_response(payload, status=200):
+    """Serialize with orjson (C-speed, emits UTF-8 bytes directly) instead of jsonify."""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+
+# Map frontend labels to database constraints
+PRIORITY_MAP = {
+    'High Priority': 'high',
+    'Medium Priority': 'medium',
+    'Low Priority': 'low',
+    'Critical': 'critical'
+}
+
+INSERT_FEEDBACK_SQL = """
+    INSERT INTO feedback (
+        user_id, issue_type, priority, description,
+        feature_suggestion, additional_info, file_path, file_name
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _normalize_priority(raw_priority):
+    return PRIORITY_MAP.get(raw_priority, raw_priority.lower() if raw_priority else 'medium')
+
+
+def _feedback_etag(body):
+    """Weak ETag from a hash of the serialized response body.
+
+    Content-derived, so the validator holds across gunicorn workers and
+    restarts; PRAGMA data_version misses same-connection writes on the
+    pooled connections, and a per-process write counter is invisible to
+    the other workers. This still pays the query on every request but
+    saves the body transfer on a match.
+    """
+    return f'W/"feedback-{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _pagination_args():
+    """Read ?limit=&after= query params for keyset pagination (id < after, newest first)."""
+    try:
+        limit = min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        limit = DEFAULT_PAGE_SIZE
+    after = None
+    if 'after' in request.args:
+        try:
+            after = int(request.args['after'])
+        except (TypeError, ValueError):
+            pass
+    return limit, after
+
 @feedback_bp.route("/api/feedback", methods=["POST"])
 @token_required
 def submit_feedback():
@@ -15,20 +76,16 @@ def submit_feedback():
     Submit user feedback with optional file attachment.
     """
     try:
-        issue_type = request.form.get('issueType')
-        raw_priority = request.form.get('priority')
-        description = request.form.get('description')
-        feature_suggestion = request.form.get('featureSuggestion', '')
-        additional_info = request.form.get('additionalInfo', '')
-        
-        # Map frontend labels to database constraints
-        priority_map = {
-            'High Priority': 'high',
-            'Medium Priority': 'medium',
-            'Low Priority': 'low',
-            'Critical': 'critical'
-        }
-        priority = priority_map.get(raw_priority, raw_priority.lower() if raw_priority else 'medium')
+        # Bind the parsed form once; request.form re-resolves the proxy and
+        # parsed-form cache on every attribute access
+        form = request.form
+        issue_type = form.get('issueType')
+        raw_priority = form.get('priority')
+        description = form.get('description')
+        feature_suggestion = form.get('featureSuggestion', '')
+        additional_info = form.get('additionalInfo', '')
+        
+        priority = _normalize_priority(raw_priority)
 
         if not all([issue_type, priority, description]):
             return jsonify({"error": "Missing required fields"}), 400
@@ -45,11 +102,20 @@ def submit_feedback():
                          from pathlib import Path
                          feedback_folder = Path(current_app.root_path).parent / "feedback_files"
                     
-                    feedback_folder.mkdir(exist_ok=True, parents=True)
                     timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
                     safe_filename = f"{timestamp}_{file.filename}"
-                    target_path = feedback_folder / safe_filename
-                    file.save(str(target_path))
+
+                    # Shard into <aa>/<bb>/ subdirectories keyed by a filename
+                    # hash so no single directory accumulates every upload
+                    # (flat dirs with tens of thousands of entries slow down
+                    # open/unlink on most filesystems)
+                    shard = hashlib.blake2b(safe_filename.encode(), digest_size=2).hexdigest()
+                    shard_dir = feedback_folder / shard[:2] / shard[2:]
+                    shard_dir.mkdir(exist_ok=True, parents=True)
+                    target_path = shard_dir / safe_filename
+                    # 1 MiB copy buffer (Werkzeug defaults to 16 KiB) — far
+                    # fewer read/write syscalls when draining the upload spool
+                    file.save(str(target_path), buffer_size=1024 * 1024)
                     file_path = str(target_path)
                     file_name = file.filename
                 except Exception as file_error:
@@ -58,29 +124,25 @@ def submit_feedback():
         user_id = getattr(request, 'user_id', 1)
         
         conn = get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            INSERT INTO feedback (
+        # `with conn:` wraps the INSERT in a single implicit transaction;
+        # RETURNING hands back the server-assigned columns in the same
+        # round-trip instead of lastrowid + a follow-up SELECT
+        with conn:
+            cur = conn.execute(INSERT_FEEDBACK_SQL + " RETURNING id, created_at", (
                 user_id, issue_type, priority, description,
-                feature_suggestion, additional_info, file_path, file_name
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            user_id, issue_type, priority, description,
-            feature_suggestion, additional_info,
-            file_path, file_name
-        ))
-        
-        feedback_id = cur.lastrowid
-        conn.commit()
+                feature_suggestion, additional_info,
+                file_path, file_name
+            ))
+            feedback_id, created_at = cur.fetchone()
         conn.close()
-        
+
         logger.info(f"📝 Feedback submitted: ID={feedback_id}, User={user_id}, Priority={priority}")
-        
+
         return jsonify({
             "success": True,
             "message": "Feedback submitted successfully",
-            "feedback_id": feedback_id
+            "feedback_id": feedback_id,
+            "created_at": created_at
         }), 201
         
     except Exception as e:
@@ -88,6 +150,57 @@ def submit_feedback():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@feedback_bp.route("/api/feedback/bulk", methods=["POST"])
+@token_required
+def submit_feedback_bulk():
+    """
+    Submit multiple feedback items in one request.
+
+    All rows are inserted via a single executemany inside one transaction,
+    so a batch of N items pays one fsync instead of N.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get('items')
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "'items' must be a non-empty array"}), 400
+
+        user_id = getattr(request, 'user_id', 1)
+
+        rows = []
+        for i, item in enumerate(items):
+            issue_type = item.get('issueType')
+            priority = _normalize_priority(item.get('priority'))
+            description = item.get('description')
+
+            if not all([issue_type, priority, description]):
+                return jsonify({"error": f"Item {i}: missing required fields"}), 400
+
+            rows.append((
+                user_id, issue_type, priority, description,
+                item.get('featureSuggestion', ''), item.get('additionalInfo', ''),
+                None, None
+            ))
+
+        conn = get_db_connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(INSERT_FEEDBACK_SQL, rows)
+        conn.close()
+
+        logger.info(f"📝 Bulk feedback submitted: {len(rows)} items, User={user_id}")
+
+        return jsonify({
+            "success": True,
+            "message": f"{len(rows)} feedback items submitted successfully",
+            "count": len(rows)
+        }), 201
+
+    except Exception as e:
+        logger.error(f"Bulk feedback submission error: {str(e)}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @feedback_bp.route("/api/feedback", methods=["GET"])
 @token_required
 def get_user_feedback():
@@ -99,26 +212,43 @@ def get_user_feedback():
         if not user_id:
             return jsonify({"error": "User not authenticated"}), 401
         
+        limit, after = _pagination_args()
+
         conn = get_db_connection()
         cur = conn.cursor()
-        
-        cur.execute("""
+
+        query = """
             SELECT id, issue_type, priority, description,
                    feature_suggestion, additional_info, file_name,
                    status, created_at, resolved_at, admin_response
             FROM feedback
             WHERE user_id = ?
-            ORDER BY created_at DESC
-        """, (user_id,))
-        
-        feedback_list = [dict(row) for row in cur.fetchall()]
+        """
+        params = [user_id]
+        if after is not None:
+            query += " AND id < ?"
+            params.append(after)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        cur.execute(query, params)
+
+        # Build plain dicts from the cursor (orjson can't serialize sqlite3.Row)
+        columns = [d[0] for d in cur.description]
+        feedback_list = [dict(zip(columns, row)) for row in cur]
         conn.close()
-        
-        return jsonify({
+
+        body = orjson.dumps({
             "success": True,
             "feedback": feedback_list
         })
-        
+        etag = _feedback_etag(body)
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=304, headers={'ETag': etag})
+
+        resp = Response(body, mimetype='application/json')
+        resp.headers['ETag'] = etag
+        return resp
+
     except Exception as e:
         logger.error(f"Get feedback error: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -135,38 +265,158 @@ def get_all_feedback_admin():
         if user_role not in ('admin', 'developer', 'ADMIN'):
             return jsonify({"error": "Admin access required"}), 403
         
+        limit, after = _pagination_args()
+
         conn = get_db_connection()
         cur = conn.cursor()
-        
-        cur.execute("""
-            SELECT 
+
+        query = """
+            SELECT
                 f.id, f.user_id, f.issue_type, f.priority, f.description,
                 f.feature_suggestion, f.additional_info, f.file_name,
                 f.status, f.created_at, f.resolved_at, f.admin_response,
                 u.username, u.email
             FROM feedback f
             LEFT JOIN users u ON f.user_id = u.id
-            ORDER BY f.created_at DESC
-        """)
-        
-        feedback_list = []
-        for row in cur.fetchall():
-            feedback_dict = dict(row)
-            feedback_list.append(feedback_dict)
-        
+        """
+        params = []
+        if after is not None:
+            query += " WHERE f.id < ?"
+            params.append(after)
+        query += " ORDER BY f.id DESC LIMIT ?"
+        params.append(limit)
+        cur.execute(query, params)
+
+        columns = [d[0] for d in cur.description]
+        feedback_list = [dict(zip(columns, row)) for row in cur]
+
         conn.close()
-        
-        return jsonify({
+
+        body = orjson.dumps({
             "success": True,
             "feedback": feedback_list,
             "total": len(feedback_list)
         })
+        etag = _feedback_etag(body)
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=304, headers={'ETag': etag})
+
+        resp = Response(body, mimetype='application/json')
+        resp.headers['ETag'] = etag
+        return resp
         
     except Exception as e:
         logger.error(f"Get all feedback error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
+@feedback_bp.route("/api/feedback/<int:feedback_id>/file", methods=["GET"])
+@token_required
+def download_feedback_file(feedback_id):
+    """
+    Download the file attached to a feedback item (owner or admin).
+    """
+    try:
+        user_id = getattr(request, 'user_id', None)
+        user_role = getattr(request, 'user_role', None)
+
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT user_id, file_path, file_name FROM feedback WHERE id = ?", (feedback_id,))
+        row = cur.fetchone()
+        conn.close()
+
+        if not row or not row['file_path']:
+            return jsonify({"error": "No file attached to this feedback"}), 404
+
+        if user_role not in ('admin', 'developer', 'ADMIN') and row['user_id'] != user_id:
+            return jsonify({"error": "Access denied"}), 403
+
+        file_path = Path(row['file_path'])
+        if not file_path.is_file():
+            return jsonify({"error": "File no longer exists"}), 404
+
+        # Hint the kernel to read the file ahead sequentially before the WSGI
+        # layer streams it (no-op on platforms without posix_fadvise)
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL | os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except (AttributeError, OSError):
+            pass
+
+        # conditional=True serves via wsgi.file_wrapper, which gunicorn/uwsgi
+        # turn into a zero-copy sendfile(2), and enables range/304 handling
+        return send_file(
+            file_path,
+            as_attachment=True,
+            download_name=row['file_name'] or file_path.name,
+            conditional=True
+        )
+
+    except Exception as e:
+        logger.error(f"Download feedback file error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+def _unlink_async(file_path):
+    """Remove an attachment without blocking the request thread.
+
+    unlink(2) hits the filesystem synchronously; for bulk purges that
+    latency adds up, so the syscall runs on a daemon thread instead.
+    """
+    def _worker(path=Path(file_path)):
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not remove feedback file {path}: {e}")
+
+    threading.Thread(target=_worker, daemon=True).start()
+
+
+@feedback_bp.route("/api/feedback/<int:feedback_id>", methods=["DELETE"])
+@token_required
+def delete_feedback(feedback_id):
+    """
+    Delete a feedback item and its attached file (Admin only).
+    """
+    try:
+        user_role = getattr(request, 'user_role', None)
+
+        if user_role not in ('admin', 'developer', 'ADMIN'):
+            return jsonify({"error": "Admin access required"}), 403
+
+        conn = get_db_connection()
+        cur = conn.cursor()
+
+        cur.execute("SELECT file_path FROM feedback WHERE id = ?", (feedback_id,))
+        row = cur.fetchone()
+        if not row:
+            conn.close()
+            return jsonify({"error": "Feedback not found"}), 404
+
+        # Queue the file removal first, then delete the row without waiting on the FS
+        if row['file_path']:
+            _unlink_async(row['file_path'])
+
+        with conn:
+            conn.execute("DELETE FROM feedback WHERE id = ?", (feedback_id,))
+        conn.close()
+
+        logger.info(f"🗑️ Feedback deleted: ID={feedback_id}")
+
+        return jsonify({
+            "success": True,
+            "message": "Feedback deleted successfully"
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Delete feedback error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 @feedback_bp.route("/api/feedback/<int:feedback_id>/status", methods=["PUT"])
 @token_required
 def update_feedback_status(feedback_id):
@@ -197,33 +447,32 @@ def update_feedback_status(feedback_id):
         if status == 'resolved':
             resolved_at = datetime.now().isoformat()
         
+        # RETURNING yields the updated row in the same statement — no
+        # follow-up re-read of the feedback table needed
         cur.execute("""
             UPDATE feedback
             SET status = ?, admin_response = ?, resolved_at = ?
             WHERE id = ?
+            RETURNING id, user_id, issue_type, priority, description,
+                      feature_suggestion, additional_info, file_name,
+                      status, created_at, resolved_at, admin_response
         """, (status, admin_response, resolved_at, feedback_id))
-        
-        conn.commit()
-        
-        # Fetch updated feedback
-        cur.execute("""
-            SELECT 
-                f.id, f.user_id, f.issue_type, f.priority, f.description,
-                f.feature_suggestion, f.additional_info, f.file_name,
-                f.status, f.created_at, f.resolved_at, f.admin_response,
-                u.username, u.email
-            FROM feedback f
-            LEFT JOIN users u ON f.user_id = u.id
-            WHERE f.id = ?
-        """, (feedback_id,))
-        
+
         row = cur.fetchone()
-        conn.close()
-        
+        conn.commit()
+
         if not row:
+            conn.close()
             return jsonify({"error": "Feedback not found"}), 404
-        
+
         feedback_dict = dict(row)
+
+        # Small indexed lookup for the submitter's identity
+        cur.execute("SELECT username, email FROM users WHERE id = ?", (feedback_dict['user_id'],))
+        user_row = cur.fetchone()
+        feedback_dict['username'] = user_row['username'] if user_row else None
+        feedback_dict['email'] = user_row['email'] if user_row else None
+        conn.close()
         
         logger.info(f"🔄 Feedback status updated: ID={feedback_id}, Status={status}")
         
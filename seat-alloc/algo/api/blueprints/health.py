@@ -1,17 +1,24 @@
 # System health and diagnostic endpoints.
 # Simple reachability check to verify that the backend services are running.
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response
 import time
 import os
+import orjson
 
 health_bp = Blueprint('health', __name__)
 
+# Everything except the timestamp is fixed after import, so the body is
+# pre-encoded once; the probe path just splices the current time in. Matters
+# because orchestrators hit this endpoint every few seconds.
+_HEALTH_STATIC = orjson.dumps({
+    "status": "healthy",
+    "environment": os.getenv('FLASK_ENV', 'development'),
+    "message": "Backend is alive and reachable"
+})[:-1]  # strip closing brace; timestamp is appended per request
+
+
 @health_bp.route('/api/health', methods=['GET'])
 def health_check():
     """Simple diagnostic endpoint to verify backend reachability"""
-    return jsonify({
-        "status": "healthy",
-        "timestamp": time.time(),
-        "environment": os.getenv('FLASK_ENV', 'development'),
-        "message": "Backend is alive and reachable"
-    }), 200
+    body = b'%s,"timestamp":%b}' % (_HEALTH_STATIC, str(time.time()).encode())
+    return Response(body, mimetype='application/json'), 200
@@ -444,37 +444,65 @@ def generate_pdf_batch():
         
         import zipfile
         import io as _io
+        from concurrent.futures import ThreadPoolExecutor
         from algo.pdf_gen.pdf_generation import generate_seating_pdf_to_buffer
 
         generated_rooms = []
         errors = []
         zip_buffer = _io.BytesIO()
 
-        with zipfile.ZipFile(zip_buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as zf:
-            for room_name in room_names:
-                # Use hybrid mechanism for each room in batch
-                room_request = {**data, 'room_name': room_name}
-                room_payload, room_source = get_seating_data_hybrid(room_request)
+        # Phase 1: resolve each room's seating payload (cache/DB, request-bound)
+        room_payloads = []
+        for room_name in room_names:
+            # Use hybrid mechanism for each room in batch
+            room_request = {**data, 'room_name': room_name}
+            room_payload, room_source = get_seating_data_hybrid(room_request)
 
-                if not room_payload:
-                    errors.append(f"Room '{room_name}' could not be retrieved")
-                    logger.warning(f"⚠️ [Batch PDF] Room '{room_name}' not found in cache or DB")
-                    continue
+            if not room_payload:
+                errors.append(f"Room '{room_name}' could not be retrieved")
+                logger.warning(f"⚠️ [Batch PDF] Room '{room_name}' not found in cache or DB")
+                continue
 
-                try:
-                    logger.info(f"📝 [Batch PDF] Generating in-memory PDF for room '{room_name}' (source={room_source})")
-                    pdf_buf = generate_seating_pdf_to_buffer(
-                        data=room_payload,
-                        user_id=str(data.get('user_id', request.user_id)),
-                        template_name=data.get('template_name', 'default')
-                    )
-                    safe_name = room_name.replace(' ', '_').replace('/', '-')
-                    zf.writestr(f"seating_plan_{safe_name}.pdf", pdf_buf.read())
-                    generated_rooms.append(room_name)
-                    logger.info(f"✅ [Batch PDF] Room '{room_name}' added to zip")
-                except Exception as e:
-                    errors.append(f"Room '{room_name}': {str(e)}")
-                    logger.error(f"❌ [Batch PDF] Room '{room_name}' failed: {e}")
+            logger.info(f"📝 [Batch PDF] Generating in-memory PDF for room '{room_name}' (source={room_source})")
+            room_payloads.append((room_name, room_payload))
+
+        # Phase 2: render PDFs in parallel — ReportLab rendering is the slow
+        # part and each room is independent, so a bounded thread pool turns
+        # 50 sequential renders into ~ceil(50/workers) waves
+        pdf_user_id = str(data.get('user_id', request.user_id))
+        template_name = data.get('template_name', 'default')
+
+        def _render_room(entry):
+            room_name, payload = entry
+            return room_name, generate_seating_pdf_to_buffer(
+                data=payload,
+                user_id=pdf_user_id,
+                template_name=template_name
+            )
+
+        pdf_buffers = {}
+        if room_payloads:
+            with ThreadPoolExecutor(max_workers=min(8, len(room_payloads))) as executor:
+                futures = {executor.submit(_render_room, entry): entry[0] for entry in room_payloads}
+                for future in futures:
+                    room_name = futures[future]
+                    try:
+                        _, pdf_buf = future.result()
+                        pdf_buffers[room_name] = pdf_buf
+                    except Exception as e:
+                        errors.append(f"Room '{room_name}': {str(e)}")
+                        logger.error(f"❌ [Batch PDF] Room '{room_name}' failed: {e}")
+
+        # Phase 3: assemble the zip on the request thread (zipfile is not thread-safe)
+        with zipfile.ZipFile(zip_buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for room_name, _ in room_payloads:
+                pdf_buf = pdf_buffers.get(room_name)
+                if pdf_buf is None:
+                    continue
+                safe_name = room_name.replace(' ', '_').replace('/', '-')
+                zf.writestr(f"seating_plan_{safe_name}.pdf", pdf_buf.read())
+                generated_rooms.append(room_name)
+                logger.info(f"✅ [Batch PDF] Room '{room_name}' added to zip")
 
         if not generated_rooms:
             return jsonify({"error": "No PDFs could be generated", "errors": errors}), 500
@@ -499,6 +527,7 @@ def generate_pdf_batch():
 
 def _dedup_sort_students(students):
     """Deduplicate by roll_number and sort."""
+    from algo.attendence_gen.attend_gen import sort_students_by_roll
     seen = set()
     unique = []
     for s in students:
@@ -506,7 +535,7 @@ def _dedup_sort_students(students):
         if r and r not in seen:
             seen.add(r)
             unique.append(s)
-    return sorted(unique, key=lambda s: s.get('roll_number', ''))
+    return sort_students_by_roll(unique)
 
 
 def _build_att_metadata(frontend_metadata, room_name):
@@ -554,7 +583,7 @@ def generate_pdf_hierarchy():
         import io as _io
         import time
         from algo.pdf_gen.pdf_generation import generate_seating_pdf_to_buffer
-        from algo.attendence_gen.attend_gen import create_attendance_pdf
+        from algo.attendence_gen.attend_gen import get_or_create_attendance_pdf
 
         frontend_metadata = data.get('metadata', {})
         zip_buffer = _io.BytesIO()
@@ -594,19 +623,13 @@ def generate_pdf_hierarchy():
                             continue
 
                         safe_batch = batch_key.replace(' ', '_').replace('/', '-')
-                        ts = int(time.time())
-                        temp_file = f"temp_att_{safe_room}_{safe_batch}_{ts}.pdf"
-                        try:
-                            create_attendance_pdf(
-                                temp_file, students, batch_key,
-                                _build_att_metadata(frontend_metadata, target_room),
-                                batch_data.get('info', {})
-                            )
-                            with open(temp_file, 'rb') as f:
-                                zf.writestr(f"{room_dir}/Attendance_PDF/{safe_batch}/Attendance_Sheet.pdf", f.read())
-                        finally:
-                            if os.path.exists(temp_file):
-                                os.remove(temp_file)
+                        # Cached render; ZipFile.write streams from the path
+                        pdf_path = get_or_create_attendance_pdf(
+                            students, batch_key,
+                            _build_att_metadata(frontend_metadata, target_room),
+                            batch_data.get('info', {})
+                        )
+                        zf.write(pdf_path, f"{room_dir}/Attendance_PDF/{safe_batch}/Attendance_Sheet.pdf")
                     except Exception as e:
                         errors.append(f"Room '{room_name}' attendance ({batch_key}): {e}")
 
@@ -621,18 +644,11 @@ def generate_pdf_hierarchy():
                                         students.append(seat)
                         students = _dedup_sort_students(students)
                         if students:
-                            ts = int(time.time())
-                            temp_file = f"temp_att_{safe_room}_all_{ts}.pdf"
-                            try:
-                                create_attendance_pdf(
-                                    temp_file, students, room_name,
-                                    _build_att_metadata(frontend_metadata, target_room), {}
-                                )
-                                with open(temp_file, 'rb') as f:
-                                    zf.writestr(f"{room_dir}/Attendance_PDF/All/Attendance_Sheet.pdf", f.read())
-                            finally:
-                                if os.path.exists(temp_file):
-                                    os.remove(temp_file)
+                            pdf_path = get_or_create_attendance_pdf(
+                                students, room_name,
+                                _build_att_metadata(frontend_metadata, target_room), {}
+                            )
+                            zf.write(pdf_path, f"{room_dir}/Attendance_PDF/All/Attendance_Sheet.pdf")
                     except Exception as e:
                         errors.append(f"Room '{room_name}' matrix attendance: {e}")
 
@@ -686,15 +702,15 @@ def download_pdf(filename):
     
     directory = os.path.abspath("algo/pdf_gen/seat_plan_generated")
     
-    # Try direct path
+    # Try direct path (conditional=True → ETag/304 for repeat downloads)
     path = os.path.join(directory, filename)
     if os.path.exists(path):
-        return send_file(path, as_attachment=True)
-    
+        return send_file(path, as_attachment=True, conditional=True)
+
     # Try searching in subdirs
     found = glob.glob(os.path.join(directory, "**", filename), recursive=True)
     if found:
-        return send_file(found[0], as_attachment=True)
+        return send_file(found[0], as_attachment=True, conditional=True)
     
     return jsonify({"error": "File not found"}), 404
 
@@ -822,7 +838,6 @@ def upload_banner():
 @token_required
 def export_attendance():
     """Export attendance sheet with correct metadata field mapping"""
-    import io
     import time
     
     try:
@@ -894,17 +909,16 @@ def export_attendance():
             matrix = seating_payload.get('seating', [])
             
             if isinstance(matrix, list) and len(matrix) > 0 and isinstance(matrix[0], list):
-                for row in matrix:
-                    for seat in row:
-                        if seat and not seat.get('is_broken') and not seat.get('is_unallocated'):
-                            # If specific batch requested, filter by batch_label
-                            if batch_or_room and batch_or_room != target_room_name:
-                                if seat.get('batch_label') == batch_or_room:
-                                    all_students.append(seat)
-                            else:
-                                all_students.append(seat)
+                from itertools import chain
+                # Flatten in one C-implemented pass instead of nested loops
+                filter_batch = batch_or_room if (batch_or_room and batch_or_room != target_room_name) else None
+                all_students = [
+                    seat for seat in chain.from_iterable(matrix)
+                    if seat and not seat.get('is_broken') and not seat.get('is_unallocated')
+                    and (filter_batch is None or seat.get('batch_label') == filter_batch)
+                ]
+
 
-        
         # Deduplicate students based on roll_number
         seen_rolls = set()
         unique_students = []
@@ -914,9 +928,11 @@ def export_attendance():
                 seen_rolls.add(roll)
                 unique_students.append(student)
         all_students = unique_students
-        
-        # Sort students by roll number
-        all_students.sort(key=lambda s: s.get('roll_number', ''))
+
+        # Sort students by roll number (numeric fast path when rolls are
+        # all-digit; see attend_gen.sort_students_by_roll)
+        from algo.attendence_gen.attend_gen import sort_students_by_roll
+        all_students = sort_students_by_roll(all_students)
         
         if not all_students:
             return jsonify({
@@ -950,13 +966,13 @@ def export_attendance():
         # Generate PDF (metadata now contains attendance settings from frontend)
         timestamp = int(time.time())
         safe_name = (target_batch_name or target_room_name or 'attendance').replace(' ', '_').replace('/', '-')
-        temp_filename = f"temp_attendance_{safe_name}_{timestamp}.pdf"
-        
+
         try:
-            from algo.attendence_gen.attend_gen import create_attendance_pdf
-            
-            create_attendance_pdf(
-                temp_filename,
+            from algo.attendence_gen.attend_gen import get_or_create_attendance_pdf
+
+            # Digest-keyed disk cache (same scheme as get_or_create_seating_pdf):
+            # identical student list + metadata reuses the previous render
+            pdf_path = get_or_create_attendance_pdf(
                 all_students,
                 target_batch_name or target_room_name or 'All',
                 complete_metadata,  # Now includes attendance settings
@@ -964,25 +980,20 @@ def export_attendance():
             )
         except ImportError:
             return jsonify({"error": "Attendance PDF generation module not available"}), 500
-        
-        # Read and send
-        return_data = io.BytesIO()
-        with open(temp_filename, 'rb') as f:
-            return_data.write(f.read())
-        return_data.seek(0)
-        
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
-        
+
         download_name = f"Attendance_{safe_name}_{complete_metadata['course_code']}_{timestamp}.pdf"
-        
+
         logger.info(f"✅ Attendance PDF generated: {download_name}")
-        
+
+        # Stream straight from the cached file — no BytesIO copy of the
+        # whole PDF; conditional=True adds ETag/Last-Modified so browsers
+        # revalidate with a 304 instead of re-downloading
         return send_file(
-            return_data,
+            pdf_path,
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=download_name
+            download_name=download_name,
+            conditional=True
         )
         
     except Exception as e:
@@ -1355,11 +1366,10 @@ def export_attendance_debarred():
             'attendance_banner_path':   frontend_metadata.get('attendance_banner_path', ''),
         }
 
-        from algo.attendence_gen.attend_gen import create_attendance_pdf
+        from algo.attendence_gen.attend_gen import get_or_create_attendance_pdf
 
         ts = int(time.time())
         zip_buffer = _io.BytesIO()
-        temp_pdfs  = []
 
         with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
             for batch_name, batch_data in batches.items():
@@ -1385,32 +1395,18 @@ def export_attendance_debarred():
                             'course_code': sub_code,
                         }
                         safe_sub  = sub_code.replace('/', '-').replace(' ', '_')
-                        temp_file = f"tmp_deb_{safe_batch}_{safe_sub}_{ts}.pdf"
-                        temp_pdfs.append(temp_file)
-
-                        create_attendance_pdf(
-                            temp_file, filtered_students,
-                            batch_name, subject_meta, batch_info
+                        # Digest includes the is_debarred flags, so a changed
+                        # debarred list re-renders instead of hitting the cache
+                        pdf_path = get_or_create_attendance_pdf(
+                            filtered_students, batch_name, subject_meta, batch_info
                         )
-                        with open(temp_file, 'rb') as pf:
-                            zf.writestr(f"{safe_batch}/{safe_sub}.pdf", pf.read())
+                        zf.write(pdf_path, f"{safe_batch}/{safe_sub}.pdf")
                 else:
                     # ── No debarred list → normal attendance PDF ───────────────
-                    temp_file = f"tmp_deb_{safe_batch}_normal_{ts}.pdf"
-                    temp_pdfs.append(temp_file)
-                    create_attendance_pdf(
-                        temp_file, students, batch_name, dict(base_meta), batch_info
+                    pdf_path = get_or_create_attendance_pdf(
+                        students, batch_name, dict(base_meta), batch_info
                     )
-                    with open(temp_file, 'rb') as pf:
-                        zf.writestr(f"{safe_batch}/Attendance_{safe_batch}.pdf", pf.read())
-
-        # ── Cleanup temp PDFs ──────────────────────────────────────────────────
-        for tf in temp_pdfs:
-            try:
-                if os.path.exists(tf):
-                    os.remove(tf)
-            except Exception:
-                pass
+                    zf.write(pdf_path, f"{safe_batch}/Attendance_{safe_batch}.pdf")
 
         zip_buffer.seek(0)
         logger.info(f"✅ Debarred attendance ZIP: {len(batches)} batches, "
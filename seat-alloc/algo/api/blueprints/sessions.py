@@ -15,6 +15,7 @@ from algo.services.auth_service import token_required
 from algo.services import SessionService, AllocationService
 from algo.core.cache.cache_manager import CacheManager
 from algo.database.queries.allocation_queries import AllocationQueries
+from algo.database.queries.session_queries import invalidate_session_cache
 
 CACHE_MGR = CacheManager()
 
@@ -36,9 +37,14 @@ def _get_user_id():
     if hasattr(request, 'user_id') and request.user_id:
         return request.user_id
     
-    auth_header = request.headers.get('Authorization', '')
-    if auth_header.startswith('Bearer '):
-        token = auth_header.split(' ')[1]
+    # Prefer the token @token_required already extracted; fall back to the
+    # raw header for paths that reach here unauthenticated
+    token = getattr(request, 'token', None)
+    if token is None:
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header.startswith('Bearer '):
+            token = auth_header.partition(' ')[2]
+    if token:
         try:
             from algo.services.auth_service import verify_token
             payload = verify_token(token)
@@ -110,7 +116,7 @@ def createSession(user_id=None, plan_id=None, upload_ids=None):
             plan_id = f"PLAN-{''.join(random.choices(string.ascii_uppercase + string.digits, k=8))}"
         
         # Create session via query layer (single source of truth for INSERT)
-        session_id = SessionQueries.create_session(plan_id, user_id)
+        session_id = SessionQueries.create_session(plan_id, user_id)['session_id']
         
         # Link uploads and count students
         db = get_db()
@@ -481,6 +487,7 @@ def heartbeat(session_id):
         
         updated = cursor.rowcount
         conn.commit()
+        invalidate_session_cache()
         conn.close()
         
         return jsonify({"success": updated > 0}), 200
@@ -538,6 +545,7 @@ def finalize_session(session_id):
         """, (datetime.now().isoformat(), session_id))
         
         conn.commit()
+        invalidate_session_cache()
         conn.close()
         
         # ✅ FIX: Finalize rooms in Cache (Prune experimental rooms and mark as FINALIZED)
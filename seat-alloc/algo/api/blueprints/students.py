@@ -1,13 +1,52 @@
 # api/blueprints/students.py - FIXED VERSION
 from flask import Blueprint, request, jsonify
 from algo.services.auth_service import token_required
+from algo.database.queries.session_queries import invalidate_session_cache
+from collections import OrderedDict
+from threading import RLock
 import logging
 import os
-import json
+import orjson
+import time
 
 student_bp = Blueprint('students', __name__, url_prefix='/api')
 logger = logging.getLogger(__name__)
 
+# Bounded in-memory cache of parsed uploads (preview → commit fast path).
+# The temp JSON file on disk stays the source of truth; this just skips the
+# re-read/re-parse when commit follows preview in the same process. TTL plus
+# a size cap means abandoned previews age out instead of leaking until
+# restart.
+UPLOAD_CACHE_MAX = 256
+UPLOAD_CACHE_TTL = 1800  # seconds
+# Keyed by (user_id, batch_id) so a hit carries the same ownership check as
+# the per-user temp directory on disk — another user presenting a leaked
+# batch_id misses the cache and falls through to their own (empty) directory.
+_upload_cache = OrderedDict()  # (user_id, batch_id) -> (expires_at, parse_data)
+_upload_cache_lock = RLock()
+
+
+def _upload_cache_put(user_id, batch_id, payload):
+    with _upload_cache_lock:
+        now = time.time()
+        # Entries are inserted in time order, so expired ones cluster at the
+        # front; evict those plus any overflow past the size cap
+        while _upload_cache:
+            oldest_expiry = next(iter(_upload_cache.values()))[0]
+            if len(_upload_cache) >= UPLOAD_CACHE_MAX or oldest_expiry <= now:
+                _upload_cache.popitem(last=False)
+            else:
+                break
+        _upload_cache[(user_id, batch_id)] = (now + UPLOAD_CACHE_TTL, payload)
+
+
+def _upload_cache_pop(user_id, batch_id):
+    with _upload_cache_lock:
+        entry = _upload_cache.pop((user_id, batch_id), None)
+    if entry and entry[0] > time.time():
+        return entry[1]
+    return None
+
 def _get_conn():
     from algo.database.db import get_db_connection
     return get_db_connection()
@@ -66,18 +105,26 @@ def upload_students():
         os.makedirs(temp_dir, exist_ok=True)
         
         temp_file = os.path.join(temp_dir, f"{parse_result.batch_id}.json")
-        
-        # Save parse result
-        with open(temp_file, 'w') as f:
-            json.dump({
-                'batch_id': parse_result.batch_id,
-                'batch_name': parse_result.batch_name,
-                'semester_name': semester_name,
-                'batch_color': parse_result.batch_color,
-                'source_filename': file.filename,
-                'data': parse_result.data,
-                'rows_extracted': parse_result.rows_extracted
-            }, f)
+
+        # Save parse result (disk copy survives restarts/other workers).
+        # orjson serializes straight to UTF-8 bytes several times faster than
+        # stdlib json, and writing to a sibling temp file followed by
+        # os.replace keeps the swap atomic, so a crash mid-write can't leave
+        # a truncated preview for commit to choke on.
+        parse_payload = {
+            'batch_id': parse_result.batch_id,
+            'batch_name': parse_result.batch_name,
+            'semester_name': semester_name,
+            'batch_color': parse_result.batch_color,
+            'source_filename': file.filename,
+            'data': parse_result.data,
+            'rows_extracted': parse_result.rows_extracted
+        }
+        tmp_path = temp_file + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(parse_payload))
+        os.replace(tmp_path, temp_file)
+        _upload_cache_put(user_id, parse_result.batch_id, parse_payload)
         
         sample = parse_result.data.get(batch_name, [])[:10]
         
@@ -128,15 +175,17 @@ def commit_upload():
             if row and row[0] is not None and row[0] != user_id:
                 return jsonify({"error": "Access denied - you do not own this session"}), 403
             
-        # Load from temp cache
+        # Load from temp cache — in-memory fast path first, disk fallback
         base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         temp_file = os.path.join(base_dir, 'cache', 'temp_uploads', str(user_id), f"{batch_id}.json")
-        
-        if not os.path.exists(temp_file):
-            return jsonify({"error": "Upload session expired. Please re-upload."}), 404
-            
-        with open(temp_file, 'r') as f:
-            parse_data = json.load(f)
+
+        parse_data = _upload_cache_pop(user_id, batch_id)
+        if parse_data is None:
+            if not os.path.exists(temp_file):
+                return jsonify({"error": "Upload session expired. Please re-upload."}), 404
+
+            with open(temp_file, 'rb') as f:
+                parse_data = orjson.loads(f.read())
             
         batch_name = parse_data['batch_name']
         semester_name = parse_data.get('semester_name', 'I')
@@ -146,8 +195,15 @@ def commit_upload():
         
         conn = _get_conn()
         cur = conn.cursor()
-        
+
         try:
+            # Take the write lock up front. The default deferred BEGIN only
+            # acquires it at the first INSERT and then has to upgrade from a
+            # read lock — which fails with SQLITE_BUSY and retries when two
+            # uploads commit at once. BEGIN IMMEDIATE serializes writers at
+            # the door; WAL readers are unaffected.
+            cur.execute("BEGIN IMMEDIATE")
+
             # 1. Create upload record
             cur.execute("""
                 INSERT INTO uploads (session_id, batch_id, batch_name, semester, original_filename, file_size, batch_color)
@@ -156,29 +212,32 @@ def commit_upload():
             
             upload_id = cur.lastrowid
             
-            # 2. Bulk insert students
-            inserted = 0
+            # 2. Bulk insert students — one executemany in the same
+            # transaction as the upload record instead of one execute (and
+            # potential IntegrityError) per row; OR IGNORE makes SQLite skip
+            # duplicates without raising into Python
+            rows = []
             for s in students_raw:
                 enrollment = s.get('enrollmentNo') or s.get('enrollment')
                 if not enrollment:
                     continue
-                    
-                try:
-                    cur.execute("""
-                        INSERT INTO students (upload_id, batch_id, batch_name, enrollment, name, batch_color, department)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        upload_id,
-                        batch_id,
-                        batch_name,
-                        str(enrollment).strip(),
-                        s.get('name', ''),
-                        batch_color,
-                        s.get('department', '')
-                    ))
-                    inserted += 1
-                except Exception as insert_err:
-                    logger.warning(f"Skip duplicate: {enrollment}")
+                rows.append((
+                    upload_id,
+                    batch_id,
+                    batch_name,
+                    str(enrollment).strip(),
+                    s.get('name', ''),
+                    batch_color,
+                    s.get('department', '')
+                ))
+
+            cur.executemany("""
+                INSERT OR IGNORE INTO students (upload_id, batch_id, batch_name, enrollment, name, batch_color, department)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            inserted = cur.rowcount
+            if inserted < len(rows):
+                logger.warning(f"Skipped {len(rows) - inserted} duplicate enrollment(s) in batch {batch_name}")
             
             # ✅ CRITICAL FIX: Update session total_students if linked to session
             if session_id:
@@ -198,6 +257,7 @@ def commit_upload():
                 logger.info(f"📊 Updated session {session_id} total to {new_total}")
             
             conn.commit()
+            invalidate_session_cache()
             
             # Cleanup temp file
             try:
@@ -231,25 +291,55 @@ def commit_upload():
 
 
 # ✅ FIXED - Add user isolation
+MAX_PAGE_SIZE = 1000           # legacy callers without ?limit= keep the old cap
+DEFAULT_PAGE_SIZE = 1000
+
+
 @student_bp.route('/students', methods=['GET'])
 @token_required
 def get_students():
+    """List the user's students. Supports keyset pagination via
+    ?limit=<n>&after=<id> — pass the smallest id of the previous page."""
+    from flask import Response
+
     user_id = getattr(request, 'user_id', None)
-    
+
+    try:
+        limit = min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        limit = DEFAULT_PAGE_SIZE
+    try:
+        after = int(request.args.get('after', 0)) or None
+    except (TypeError, ValueError):
+        after = None
+
     conn = _get_conn()
-    conn.row_factory = lambda c, r: dict(zip([col[0] for col in c.description], r))
+    conn.row_factory = None  # plain tuples; one zip per row below
     cur = conn.cursor()
-    
-    # Only get students from user's sessions
-    cur.execute("""
+    cur.arraysize = 200  # fetch in batches instead of one row per C call
+
+    # Only get students from user's sessions; `s.id < after` continues from
+    # the previous page without an OFFSET scan
+    query = """
         SELECT s.* FROM students s
         JOIN uploads u ON s.upload_id = u.id
         JOIN allocation_sessions sess ON u.session_id = sess.session_id
         WHERE sess.user_id = ?
-        ORDER BY s.id DESC LIMIT 1000
-    """, (user_id,))
-    
-    rows = cur.fetchall()
+    """
+    params = [user_id]
+    if after is not None:
+        query += " AND s.id < ?"
+        params.append(after)
+    query += " ORDER BY s.id DESC LIMIT ?"
+    params.append(limit)
+
+    cur.execute(query, params)
+    columns = [col[0] for col in cur.description]
+    rows = [dict(zip(columns, row)) for row in cur]
     conn.close()
-    
-    return jsonify(rows), 200
\ No newline at end of file
+
+    resp = Response(orjson.dumps(rows), mimetype='application/json')
+    # Short private TTL: lets a browser re-render (sort, tab switch) without
+    # refetching, while staying fresh enough for upload/commit flows.
+    resp.headers['Cache-Control'] = 'private, max-age=5'
+    return resp, 200
\ No newline at end of file
@@ -117,11 +117,15 @@ def download_template(filename):
                 'dir_contents': os.listdir(templates_dir) if os.path.exists(templates_dir) else []
             }), 404
 
+        # Template CSVs are fixed content: let browsers cache them for an
+        # hour and revalidate via the etag send_from_directory derives from
+        # the file's mtime/size (304s instead of re-downloads)
         return send_from_directory(
             templates_dir,
             filename,
             as_attachment=True,
-            mimetype='text/csv'
+            mimetype='text/csv',
+            max_age=3600
         )
     except Exception as e:
         import traceback
@@ -216,4 +220,4 @@ def get_format_info():
                 'Column names are case-insensitive'
             ]
         }
-    }), 200
+    }), 200, {'Cache-Control': 'public, max-age=3600'}
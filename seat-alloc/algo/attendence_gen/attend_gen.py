@@ -1,6 +1,12 @@
+import hashlib
 import json
 import os
 from pathlib import Path
+
+try:
+    import xxhash  # Optional: xxh3 is several times faster than BLAKE2 for cache keys
+except ImportError:
+    xxhash = None
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
@@ -11,7 +17,133 @@ from reportlab.lib.units import cm
 # Use paths relative to this file's location (works on any OS)
 _BASE_DIR = Path(__file__).resolve().parent
 IMAGE_PATH = str(_BASE_DIR / "data" / "banner.png")
-CACHE_DIR = str(_BASE_DIR.parent / "cache") 
+CACHE_DIR = str(_BASE_DIR.parent / "cache")
+
+# ReportLab styles are immutable for our purposes, so build them once at
+# import instead of re-running getSampleStyleSheet()/clone() per PDF
+_STYLES = getSampleStyleSheet()
+for _style in _STYLES.byName.values():
+    _style.fontName = 'Times-Roman'
+
+_HEADER_STYLE = _STYLES['Normal'].clone('HeaderStyle')
+_HEADER_STYLE.alignment = 1
+
+_TITLE_STYLE = _STYLES['Normal'].clone('TitleStyle')
+_TITLE_STYLE.alignment = 1
+_TITLE_STYLE.textColor = colors.darkgreen
+
+_INFO_STYLE = _STYLES['Normal'].clone('InfoStyle')
+_SIG_STYLE = _STYLES['Normal'].clone('SigStyle')
+
+_ANS_CELL_STYLE = _STYLES['Normal'].clone('AnsCellStyle')
+_ANS_CELL_STYLE.alignment = 1  # Center alignment
+
+_INFO_TABLE_STYLE = TableStyle([
+    ('LEFTPADDING', (0,0), (-1,-1), 0),
+    ('TOPPADDING', (0,0), (-1,-1), 1),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 1),
+    ('FONTNAME', (0,0), (-1,-1), 'Times-Roman')
+])
+
+# Base commands for the main attendance table; copied per call so the
+# debarred-row backgrounds can be appended without mutating the shared list
+_BASE_TABLE_CMDS = [
+    ('GRID',          (0, 0), (-1, -1), 1, colors.black),
+    ('ALIGN',         (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN',        (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTSIZE',      (0, 0), (-1, -1), 10),
+    ('FONTNAME',      (0, 0), (-1, -1), 'Times-Roman'),
+    ('FONTNAME',      (0, 0), (-1,  0), 'Times-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1,  0), 3),
+    ('TOPPADDING',    (0, 0), (-1,  0), 3),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 2),
+    ('TOPPADDING',    (0, 1), (-1, -1), 2),
+    ('ALIGN',         (1, 1), (1,  -1), 'LEFT'),
+]
+
+_SUMMARY_TABLE_STYLE = TableStyle([
+    ('GRID', (0, 0), (-1, -1), 0.8, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ('FONTNAME', (0,0), (-1,-1), 'Times-Roman')
+])
+
+_SIG_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+    ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+])
+
+def attendance_payload_digest(student_list, batch_label, metadata, extracted_info=None, template_config=None):
+    """
+    Stable cache key for an attendance sheet.
+
+    Streams the fields that affect the rendered PDF into an incremental
+    hasher instead of json.dumps(..., sort_keys=True) on the whole payload
+    — no large intermediate string, no per-call key sort. Cached files
+    persist across restarts with no other invalidation path, so anything
+    the renderer reads (per-student name/roll/set/debar flag, the header
+    fields from extracted_info, template overrides) must land in the hash.
+    Uses xxh3 when available (cryptographic strength is not needed for a
+    filesystem cache key); falls back to BLAKE2 from the stdlib.
+    """
+    h = xxhash.xxh3_64() if xxhash else hashlib.blake2b(digest_size=16)
+    h.update(str(batch_label).encode())
+    for key in ('exam_title', 'course_name', 'course_code', 'date', 'time',
+                'room_no', 'attendance_dept_name', 'attendance_year',
+                'attendance_exam_heading', 'attendance_banner_path'):
+        h.update(f"{key}={metadata.get(key, '')};".encode())
+    info = extracted_info or {}
+    for key in ('branch', 'joining_year', 'degree'):
+        h.update(f"{key}={info.get(key, '')};".encode())
+    if template_config:
+        h.update(json.dumps(template_config, sort_keys=True, default=str).encode())
+    for student in student_list:
+        h.update(
+            f"{student.get('roll_number', '')}|{student.get('student_name', '')}"
+            f"|{student.get('paper_set', '')}"
+            f"|{1 if student.get('is_debarred') else 0};".encode()
+        )
+    return h.hexdigest()
+
+def sort_students_by_roll(student_list):
+    """
+    Return students ordered by roll number.
+
+    Fast path: when every roll is purely numeric, compare ints — int tuple
+    comparison is several times cheaper than str for large merged batches.
+    Alphanumeric rolls (BTCS241001, ...) fall back to the lexicographic
+    sort; both paths build the key once per student (decorate-sort).
+    """
+    try:
+        decorated = sorted(
+            (int(s.get('roll_number') or 0), i, s) for i, s in enumerate(student_list)
+        )
+    except (TypeError, ValueError):
+        decorated = sorted(
+            (str(s.get('roll_number', '')), i, s) for i, s in enumerate(student_list)
+        )
+    return [s for _, _, s in decorated]
+
+
+# Digest-keyed attendance PDF cache (mirrors pdf_gen's seat_plan_generated)
+ATTENDANCE_CACHE_DIR = os.path.join(CACHE_DIR, 'attendance_generated')
+os.makedirs(ATTENDANCE_CACHE_DIR, exist_ok=True)
+
+
+def get_or_create_attendance_pdf(student_list, batch_label, metadata, extracted_info, template_config=None):
+    """
+    Render an attendance sheet into the digest-keyed cache (or reuse the
+    existing file) and return its path. Callers hand the path straight to
+    send_file / ZipFile.write so the bytes never pass through Python.
+    """
+    digest = attendance_payload_digest(student_list, batch_label, metadata, extracted_info, template_config)
+    path = os.path.join(ATTENDANCE_CACHE_DIR, f"attendance_{digest}.pdf")
+    if not os.path.exists(path):
+        create_attendance_pdf(path, student_list, batch_label, metadata, extracted_info, template_config)
+    return path
+
 
 def header_and_footer(c, doc, room_no):
     """Restored original header/footer logic with banner image"""
@@ -96,15 +228,8 @@ def create_attendance_pdf(filename, student_list, batch_label, metadata, extract
     )
     
     story = []
-    styles = getSampleStyleSheet()
-    
-    # Set font to Times-Roman for all styles
-    for style in styles.byName.values():
-        style.fontName = 'Times-Roman'
+    header_style = _HEADER_STYLE
 
-    header_style = styles['Normal'].clone('HeaderStyle')
-    header_style.alignment = 1 
-    
     # Department header
     story.append(Paragraph(f"<u><b>{dept_header}</b></u>", header_style))
     story.append(Spacer(1, 0.05*cm))
@@ -118,13 +243,10 @@ def create_attendance_pdf(filename, student_list, batch_label, metadata, extract
     ))
     
     # Exam heading
-    title_style = styles['Normal'].clone('TitleStyle')
-    title_style.alignment = 1
-    title_style.textColor = colors.darkgreen
-    story.append(Paragraph(f"<b>{attendance_exam_heading}</b>", title_style))
+    story.append(Paragraph(f"<b>{attendance_exam_heading}</b>", _TITLE_STYLE))
     story.append(Spacer(1, 0.15*cm))
 
-    info_style = styles['Normal'].clone('InfoStyle')
+    info_style = _INFO_STYLE
     info_data = [
         [Paragraph(f"<b>Course Name :- {metadata.get('course_name', 'N/A')}</b>", info_style), 
          Paragraph(f"<b>Course Code :- {metadata.get('course_code', 'N/A')}</b>", info_style)],
@@ -132,12 +254,7 @@ def create_attendance_pdf(filename, student_list, batch_label, metadata, extract
          Paragraph(f"<b>Time :- {metadata.get('time', '')}</b>", info_style)]
     ]
     info_table = Table(info_data, colWidths=[10*cm, 8.5*cm])
-    info_table.setStyle(TableStyle([
-        ('LEFTPADDING', (0,0), (-1,-1), 0),
-        ('TOPPADDING', (0,0), (-1,-1), 1),
-        ('BOTTOMPADDING', (0,0), (-1,-1), 1),
-        ('FONTNAME', (0,0), (-1,-1), 'Times-Roman')
-    ]))
+    info_table.setStyle(_INFO_TABLE_STYLE)
     story.append(info_table)
     story.append(Spacer(1, 0.15*cm))
 
@@ -145,7 +262,7 @@ def create_attendance_pdf(filename, student_list, batch_label, metadata, extract
     data = [table_headers]
 
     # Defensive: Ensure students are sorted by roll number
-    student_list = sorted(student_list, key=lambda s: s.get('roll_number', ''))
+    student_list = sort_students_by_roll(student_list)
 
     debarred_row_indices = []  # 1-based table row indices (header = row 0)
 
@@ -163,9 +280,7 @@ def create_attendance_pdf(filename, student_list, batch_label, metadata, extract
         sig_cell = ""
 
         if is_debarred:
-            ans_style = styles['Normal'].clone(f'AnsCell_{i}')
-            ans_style.alignment = 1  # Center alignment
-            ans_booklet_cell = Paragraph('DU&nbsp;&nbsp;&nbsp;<font color="red">DEBARRED</font>&nbsp;&nbsp;', ans_style)
+            ans_booklet_cell = Paragraph('DU&nbsp;&nbsp;&nbsp;<font color="red">DEBARRED</font>&nbsp;&nbsp;', _ANS_CELL_STYLE)
             debarred_row_indices.append(table_row_idx)
 
         data.append([
@@ -180,20 +295,8 @@ def create_attendance_pdf(filename, student_list, batch_label, metadata, extract
     col_widths = [1.3*cm, 5.5*cm, 3.6*cm, 2.4*cm, 3.6*cm, 3.1*cm]
     total_table_width = sum(col_widths)
 
-    # Build base table style
-    table_style_cmds = [
-        ('GRID',          (0, 0), (-1, -1), 1, colors.black),
-        ('ALIGN',         (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN',        (0, 0), (-1, -1), 'MIDDLE'),
-        ('FONTSIZE',      (0, 0), (-1, -1), 10),
-        ('FONTNAME',      (0, 0), (-1, -1), 'Times-Roman'),
-        ('FONTNAME',      (0, 0), (-1,  0), 'Times-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1,  0), 3),
-        ('TOPPADDING',    (0, 0), (-1,  0), 3),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 2),
-        ('TOPPADDING',    (0, 1), (-1, -1), 2),
-        ('ALIGN',         (1, 1), (1,  -1), 'LEFT'),
-    ]
+    # Build base table style from the precompiled commands
+    table_style_cmds = list(_BASE_TABLE_CMDS)
     # Highlight every debarred row with a light red background
     for dr in debarred_row_indices:
         table_style_cmds.append(('BACKGROUND', (0, dr), (-1, dr), colors.HexColor('#FFE4E4')))
@@ -210,27 +313,16 @@ def create_attendance_pdf(filename, student_list, batch_label, metadata, extract
         [Paragraph("<b>No. of Supplementary Copy =</b>", info_style)]
     ]
     summary_table = Table(summary_data, colWidths=[total_table_width])
-    summary_table.setStyle(TableStyle([
-        ('GRID', (0, 0), (-1, -1), 0.8, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 4),
-        ('TOPPADDING', (0, 0), (-1, -1), 3),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ('FONTNAME', (0,0), (-1,-1), 'Times-Roman')
-    ]))
+    summary_table.setStyle(_SUMMARY_TABLE_STYLE)
     story.append(summary_table)
     story.append(Spacer(1, 1.7 * cm))
-    
-    sig_style = styles['Normal'].clone('SigStyle')
+
     sig_data = [[
-        Paragraph("<b>1. Signature and Name of invigilator</b>", sig_style),
-        Paragraph("<b>2. Signature and Name of invigilator</b>", sig_style)
+        Paragraph("<b>1. Signature and Name of invigilator</b>", _SIG_STYLE),
+        Paragraph("<b>2. Signature and Name of invigilator</b>", _SIG_STYLE)
     ]]
     sig_table = Table(sig_data, colWidths=[total_table_width/1.5, total_table_width/2 - 80])
-    sig_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-        ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-    ]))
+    sig_table.setStyle(_SIG_TABLE_STYLE)
     story.append(sig_table)
 
     # Build PDF with header/footer on all pages
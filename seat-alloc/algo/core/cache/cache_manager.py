@@ -26,6 +26,13 @@ from typing import Optional
 CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'cache')
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+# Parsed-snapshot memo shared by all CacheManager instances. Keyed by file
+# path + mtime_ns so an on-disk rewrite invalidates the entry naturally; the
+# PDF and attendance flows hit the same plan repeatedly and skip both the
+# stat+read syscalls and the json.loads on repeat access.
+_SNAPSHOT_MEMO_MAX = 64
+_snapshot_memo = {}  # file_path -> (mtime_ns, parsed dict)
+
 class AlgoEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Enum): return obj.value
@@ -207,32 +214,47 @@ class CacheManager:
         file_path = self.get_file_path(plan_id)
         with open(file_path, 'w') as f:
             json.dump(payload, f, indent=4, cls=AlgoEncoder)
-            
+        _snapshot_memo.pop(file_path, None)
+
         logger.info(f"✅ Updated cache: {os.path.basename(file_path)}")
         return plan_id
 
     def load_snapshot(self, plan_id, silent=False):
-        """Load saved snapshot"""
+        """Load saved snapshot (memoized on the file's mtime)"""
         file_path = self.get_file_path(plan_id)
-        if os.path.exists(file_path):
-            try:
-                with open(file_path, 'r') as f:
-                    if not silent:
-                        logger.info(f"🔍 [L1-CACHE] Checking cache for plan: {plan_id}")
-                    data = json.load(f)
-                    
-                    # Log hit if successful
-                    if not silent:
-                        room_report = data.get('metadata', {}).get('latest_room') or data.get('inputs', {}).get('room_no', 'Unknown')
-                        logger.info(f"⚡ [L1-CACHE HIT] Seating loaded from cache (room: {room_report})")
-                    return data
-            except Exception:
-                return None
-        return None
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        except OSError:
+            return None
+
+        memoized = _snapshot_memo.get(file_path)
+        if memoized is not None and memoized[0] == mtime_ns:
+            if not silent:
+                logger.info(f"⚡ [L1-CACHE HIT] Seating for plan {plan_id} served from memory")
+            return memoized[1]
+
+        try:
+            with open(file_path, 'r') as f:
+                if not silent:
+                    logger.info(f"🔍 [L1-CACHE] Checking cache for plan: {plan_id}")
+                data = json.load(f)
+
+                # Log hit if successful
+                if not silent:
+                    room_report = data.get('metadata', {}).get('latest_room') or data.get('inputs', {}).get('room_no', 'Unknown')
+                    logger.info(f"⚡ [L1-CACHE HIT] Seating loaded from cache (room: {room_report})")
+
+                if len(_snapshot_memo) >= _SNAPSHOT_MEMO_MAX:
+                    _snapshot_memo.pop(next(iter(_snapshot_memo)))
+                _snapshot_memo[file_path] = (mtime_ns, data)
+                return data
+        except Exception:
+            return None
 
     def delete_snapshot(self, plan_id):
         """Delete a snapshot"""
         file_path = self.get_file_path(plan_id)
+        _snapshot_memo.pop(file_path, None)
         if os.path.exists(file_path):
             os.remove(file_path)
             return True
@@ -319,7 +341,8 @@ class CacheManager:
         file_path = self.get_file_path(plan_id)
         with open(file_path, 'w') as f:
             json.dump(data, f, indent=4, cls=AlgoEncoder)
-        
+        _snapshot_memo.pop(file_path, None)
+
         return True
     
     # ==================================================
@@ -454,7 +477,8 @@ class CacheManager:
         file_path = self.get_file_path(plan_id)
         with open(file_path, 'w') as f:
             json.dump(data, f, indent=4, cls=AlgoEncoder)
-        
+        _snapshot_memo.pop(file_path, None)
+
         logger.info(f"✅ Patched seat [{row},{col}] in room {room_no} of plan {plan_id}")
         return True
     
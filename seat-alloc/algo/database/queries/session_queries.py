@@ -1,48 +1,209 @@
+import logging
 import sqlite3
 import datetime
+import json
+import time
+import threading
+from uuid import uuid4
+from collections import OrderedDict
+from threading import RLock
 from typing import Optional, Dict, List, Any
-from algo.database.db import get_db
+from algo.database.db import get_db, rows_as_dicts
+from algo.config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+# Hot single-row lookups run on nearly every request. Keeping the SQL as
+# module constants guarantees byte-identical statement text, so every call
+# hits the connection's compiled-statement LRU (sized in algo.database.db)
+# instead of re-tokenizing the query.
+GET_SESSION_BY_ID_SQL = "SELECT * FROM allocation_sessions WHERE session_id = ?"
+
+GET_SESSION_BY_PLAN_ID_SQL = "SELECT * FROM allocation_sessions WHERE plan_id = ?"
+
+# Room counts come from a grouped LEFT JOIN scoped to the user's active
+# sessions instead of a correlated scalar subquery, so allocations is scanned
+# once per call rather than re-planned per candidate row. Binds user_id twice.
+GET_ACTIVE_SESSION_FOR_USER_SQL = """
+    SELECT s.*, COALESCE(ar.allocated_rooms, 0) as allocated_rooms
+    FROM allocation_sessions s
+    LEFT JOIN (
+        SELECT a.session_id, COUNT(DISTINCT a.classroom_id) AS allocated_rooms
+        FROM allocations a
+        JOIN allocation_sessions s2 ON s2.session_id = a.session_id
+        WHERE s2.user_id = ? AND s2.status = 'active'
+        GROUP BY a.session_id
+    ) ar ON ar.session_id = s.session_id
+    WHERE s.user_id = ? AND s.status = 'active'
+    ORDER BY s.last_activity DESC
+    LIMIT 1
+"""
+
+# EXISTS stops at the first matching row, unlike COUNT(*) which scans every
+# matching upload/allocation just to learn the session isn't empty.
+CHECK_EMPTY_SESSION_SQL = """
+    SELECT EXISTS(SELECT 1 FROM uploads WHERE session_id = ?)
+         + EXISTS(SELECT 1 FROM allocations WHERE session_id = ?)
+"""
+
+# Session rows change rarely but are re-read by auth/status/stats endpoints on
+# nearly every request, so single-row lookups go through a small TTL cache.
+# Any write in this module clears the whole cache — writes are orders of
+# magnitude rarer than reads, and a full clear sidesteps tracking the
+# session_id <-> plan_id mapping per entry. Keys include the DB path so tests
+# that patch Config.DB_PATH never see rows from another database.
+_SESSION_CACHE_MAX = 1024
+_SESSION_CACHE_TTL = 120  # seconds
+_session_cache = OrderedDict()  # (db_path, kind, key) -> (expires_at, row dict)
+_session_cache_lock = RLock()
+
+
+def invalidate_session_cache():
+    """Drop all cached session rows. Call after any direct write to
+    allocation_sessions that bypasses SessionQueries."""
+    with _session_cache_lock:
+        _session_cache.clear()
+
+
+def _session_cache_get(kind, key):
+    cache_key = (str(Config.DB_PATH), kind, key)
+    with _session_cache_lock:
+        entry = _session_cache.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, row = entry
+        if time.monotonic() >= expires_at:
+            _session_cache.pop(cache_key, None)
+            return None
+        # Copy so callers mutating the result can't poison the cache
+        return dict(row)
+
+
+def _session_cache_put(kind, key, row):
+    cache_key = (str(Config.DB_PATH), kind, key)
+    with _session_cache_lock:
+        while len(_session_cache) >= _SESSION_CACHE_MAX:
+            _session_cache.popitem(last=False)
+        _session_cache[cache_key] = (time.monotonic() + _SESSION_CACHE_TTL, dict(row))
+
+
+UPDATE_SESSION_STATS_SQL = """
+    UPDATE allocation_sessions
+    SET total_students = ?, allocated_count = ?, last_activity = CURRENT_TIMESTAMP
+    WHERE session_id = ?
+"""
+
+# update_session_stats fires once per room as allocation progresses, each
+# call paying a commit/fsync. Calls are coalesced instead: only the latest
+# (total, allocated) per session is kept and a short timer flushes everything
+# in one transaction. Read paths call _flush_session_stats() first, so
+# callers still see their own writes immediately.
+_STATS_FLUSH_DELAY = 0.25  # seconds
+_pending_stats = {}  # (db_path, session_id) -> (total, allocated)
+_pending_stats_lock = RLock()
+_stats_timer = None
+
+
+def _flush_session_stats():
+    """Write out the newest queued counters, one transaction per DB file."""
+    global _stats_timer
+    with _pending_stats_lock:
+        pending = dict(_pending_stats)
+        _pending_stats.clear()
+        if _stats_timer is not None:
+            _stats_timer.cancel()
+            _stats_timer = None
+    if not pending:
+        return
+
+    by_path = {}
+    for (db_path, session_id), (total, allocated) in pending.items():
+        by_path.setdefault(db_path, []).append((total, allocated, session_id))
+
+    for db_path, rows in by_path.items():
+        try:
+            # Timer threads have no Flask context, so use a plain short-lived
+            # connection rather than get_db()
+            conn = sqlite3.connect(db_path, timeout=20)
+            try:
+                conn.executemany(UPDATE_SESSION_STATS_SQL, rows)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"❌ Failed to flush session stats for {db_path}: {e}")
+    invalidate_session_cache()
+
+
+def _flush_pending_stats_if_any():
+    # Unlocked peek is fine: a stale positive just makes the flush a no-op
+    if _pending_stats:
+        _flush_session_stats()
+
 
 class SessionQueries:
     @staticmethod
     def get_session_by_id(session_id: int) -> Optional[Dict]:
+        _flush_pending_stats_if_any()
+        cached = _session_cache_get('id', session_id)
+        if cached is not None:
+            return cached
         db = get_db()
-        cursor = db.execute("SELECT * FROM allocation_sessions WHERE session_id = ?", (session_id,))
+        cursor = db.execute(GET_SESSION_BY_ID_SQL, (session_id,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        if not row:
+            return None
+        _session_cache_put('id', session_id, dict(row))
+        return dict(row)
 
     @staticmethod
     def get_session_by_plan_id(plan_id: str) -> Optional[Dict]:
+        _flush_pending_stats_if_any()
+        cached = _session_cache_get('plan', plan_id)
+        if cached is not None:
+            return cached
         db = get_db()
-        cursor = db.execute("SELECT * FROM allocation_sessions WHERE plan_id = ?", (plan_id,))
+        cursor = db.execute(GET_SESSION_BY_PLAN_ID_SQL, (plan_id,))
         row = cursor.fetchone()
-        return dict(row) if row else None
+        if not row:
+            return None
+        _session_cache_put('plan', plan_id, dict(row))
+        return dict(row)
 
     @staticmethod
-    def create_session(plan_id: str, user_id: int, name: str = None) -> int:
+    def create_session(plan_id: str, user_id: int, name: str = None) -> Dict:
+        """Insert a session and return the full row in one round-trip.
+
+        RETURNING * folds the usual "create then load" pair into a single
+        statement, so callers get defaults like status/created_at without a
+        follow-up get_session_by_id.
+        """
         db = get_db()
         cursor = db.execute(
             """
             INSERT INTO allocation_sessions (plan_id, user_id, name, status, created_at)
             VALUES (?, ?, ?, 'active', CURRENT_TIMESTAMP)
+            RETURNING *
             """,
             (plan_id, user_id, name)
         )
+        row = cursor.fetchone()
         db.commit()
-        return cursor.lastrowid
+        invalidate_session_cache()
+        return dict(row)
 
     @staticmethod
     def update_session_stats(session_id: int, total: int, allocated: int):
-        db = get_db()
-        db.execute(
-            """
-            UPDATE allocation_sessions 
-            SET total_students = ?, allocated_count = ?, last_activity = CURRENT_TIMESTAMP
-            WHERE session_id = ?
-            """,
-            (total, allocated, session_id)
-        )
-        db.commit()
+        """Queue the latest counters; a short timer batches them into one
+        UPDATE transaction (see _flush_session_stats)."""
+        global _stats_timer
+        with _pending_stats_lock:
+            _pending_stats[(str(Config.DB_PATH), session_id)] = (total, allocated)
+            if _stats_timer is None:
+                _stats_timer = threading.Timer(_STATS_FLUSH_DELAY, _flush_session_stats)
+                _stats_timer.daemon = True
+                _stats_timer.start()
+        invalidate_session_cache()
 
     @staticmethod
     def mark_session_completed(session_id: int):
@@ -56,6 +217,7 @@ class SessionQueries:
             (session_id,)
         )
         db.commit()
+        invalidate_session_cache()
 
     @staticmethod
     def expire_session(session_id: int, hard_delete: bool = False):
@@ -68,6 +230,12 @@ class SessionQueries:
         """
         db = get_db()
         if hard_delete:
+            # Run the whole delete chain as one explicit transaction so the
+            # journal is flushed once instead of per statement. The manual
+            # ordering stays (rather than relying on ON DELETE CASCADE)
+            # because PRAGMA foreign_keys is off at runtime and
+            # uploads.session_id is declared ON DELETE SET NULL.
+            db.execute("BEGIN IMMEDIATE")
             # Delete in order respecting foreign keys
             # 1. Delete allocations
             db.execute("DELETE FROM allocations WHERE session_id = ?", (session_id,))
@@ -99,9 +267,11 @@ class SessionQueries:
                 (session_id,)
             )
         db.commit()
+        invalidate_session_cache()
     
     @staticmethod
     def get_active_sessions(user_id: Optional[int] = None) -> List[Dict]:
+        _flush_pending_stats_if_any()
         db = get_db()
         query = "SELECT * FROM allocation_sessions WHERE status IN ('active', 'completed')"
         params = []
@@ -111,20 +281,16 @@ class SessionQueries:
         
         query += " ORDER BY created_at DESC"
         cursor = db.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+        return rows_as_dicts(cursor)
 
     @staticmethod
     def check_empty_session(session_id: int) -> bool:
         db = get_db()
-        cursor = db.execute("""
-            SELECT 
-                (SELECT COUNT(*) FROM uploads WHERE session_id = ?) as upload_count,
-                (SELECT COUNT(*) FROM allocations WHERE session_id = ?) as allocation_count
-        """, (session_id, session_id))
+        cursor = db.execute(CHECK_EMPTY_SESSION_SQL, (session_id, session_id))
         row = cursor.fetchone()
         if not row:
             return True # Treat non-existent as empty/deletable
-        return row['upload_count'] == 0 and row['allocation_count'] == 0
+        return row[0] == 0
 
     @staticmethod
     def get_active_session_for_user(user_id: int) -> Optional[Dict[str, Any]]:
@@ -138,19 +304,13 @@ class SessionQueries:
         Returns:
             Session dict with allocated_rooms count included, or None
         """
+        _flush_pending_stats_if_any()
         db = get_db()
-        
+
         # Only get user's own active session - no fallback to other users
-        cursor = db.execute("""
-            SELECT s.*, 
-                   (SELECT COUNT(DISTINCT classroom_id) FROM allocations WHERE session_id = s.session_id) as allocated_rooms
-            FROM allocation_sessions s 
-            WHERE s.user_id = ? AND s.status = 'active'
-            ORDER BY s.last_activity DESC
-            LIMIT 1
-        """, (user_id,))
+        cursor = db.execute(GET_ACTIVE_SESSION_FOR_USER_SQL, (user_id, user_id))
         session = cursor.fetchone()
-        
+
         return dict(session) if session else None
 
     @staticmethod
@@ -170,17 +330,11 @@ class SessionQueries:
         Returns:
             Session dict or None (if no session and auto_create=False)
         """
+        _flush_pending_stats_if_any()
         db = get_db()
-        
+
         # First, check for existing active session
-        cursor = db.execute("""
-            SELECT s.*, 
-                   (SELECT COUNT(DISTINCT classroom_id) FROM allocations WHERE session_id = s.session_id) as allocated_rooms
-            FROM allocation_sessions s 
-            WHERE s.user_id = ? AND s.status = 'active'
-            ORDER BY s.last_activity DESC
-            LIMIT 1
-        """, (user_id,))
+        cursor = db.execute(GET_ACTIVE_SESSION_FOR_USER_SQL, (user_id, user_id))
         session = cursor.fetchone()
         
         if session:
@@ -191,28 +345,21 @@ class SessionQueries:
             return None
         
         # Auto-create a new session
-        import uuid
-        plan_id = str(uuid.uuid4())
+        plan_id = str(uuid4())
         name = session_name or "Auto Session"
         
         cursor = db.execute("""
             INSERT INTO allocation_sessions (plan_id, user_id, name, status, created_at, last_activity)
             VALUES (?, ?, ?, 'active', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            RETURNING *
         """, (plan_id, user_id, name))
+        row = cursor.fetchone()
         db.commit()
-        
-        session_id = cursor.lastrowid
-        
-        return {
-            'session_id': session_id,
-            'plan_id': plan_id,
-            'user_id': user_id,
-            'name': name,
-            'status': 'active',
-            'total_students': 0,
-            'allocated_count': 0,
-            'allocated_rooms': 0
-        }
+        invalidate_session_cache()
+
+        session = dict(row)
+        session['allocated_rooms'] = 0  # brand new, nothing allocated yet
+        return session
 
     @staticmethod
     def expire_all_active_sessions(user_id: int = None) -> int:
@@ -226,20 +373,39 @@ class SessionQueries:
             Number of sessions expired
         """
         db = get_db()
-        if user_id:
-            cursor = db.execute("""
-                UPDATE allocation_sessions 
-                SET status = 'expired', last_activity = CURRENT_TIMESTAMP
-                WHERE user_id = ? AND status = 'active'
-            """, (user_id,))
-        else:
-            cursor = db.execute("""
-                UPDATE allocation_sessions 
-                SET status = 'expired', last_activity = CURRENT_TIMESTAMP
-                WHERE status = 'active'
-            """)
-        db.commit()
-        return cursor.rowcount
+        # Expire in bounded chunks (IN (SELECT ... LIMIT) stands in for
+        # UPDATE ... LIMIT, which needs a non-default SQLite build). Each
+        # chunk is its own commit, so the writer lock is held briefly and
+        # WAL growth per transaction stays bounded on large tenants.
+        chunk = 1000
+        total = 0
+        while True:
+            if user_id:
+                cursor = db.execute("""
+                    UPDATE allocation_sessions
+                    SET status = 'expired', last_activity = CURRENT_TIMESTAMP
+                    WHERE session_id IN (
+                        SELECT session_id FROM allocation_sessions
+                        WHERE user_id = ? AND status = 'active'
+                        LIMIT ?
+                    )
+                """, (user_id, chunk))
+            else:
+                cursor = db.execute("""
+                    UPDATE allocation_sessions
+                    SET status = 'expired', last_activity = CURRENT_TIMESTAMP
+                    WHERE session_id IN (
+                        SELECT session_id FROM allocation_sessions
+                        WHERE status = 'active'
+                        LIMIT ?
+                    )
+                """, (chunk,))
+            db.commit()
+            total += cursor.rowcount
+            if cursor.rowcount < chunk:
+                break
+        invalidate_session_cache()
+        return total
 
     @staticmethod
     def claim_orphaned_sessions(user_id: int) -> int:
@@ -259,6 +425,7 @@ class SessionQueries:
             WHERE user_id IS NULL AND status = 'active'
         """, (user_id,))
         db.commit()
+        invalidate_session_cache()
         return cursor.rowcount
 
     @staticmethod
@@ -275,6 +442,7 @@ class SessionQueries:
         Returns:
             List of session dicts with pending_count calculated
         """
+        _flush_pending_stats_if_any()
         db = get_db()
         
         # Only return sessions owned by this user - strict isolation
@@ -294,13 +462,11 @@ class SessionQueries:
         
         cursor = db.execute(query, params)
         
-        sessions = []
-        for row in cursor.fetchall():
-            session_dict = dict(row)
+        sessions = rows_as_dicts(cursor)
+        for session_dict in sessions:
             total = session_dict.get('total_students') or 0
             allocated = session_dict.get('allocated_count') or 0
             session_dict['pending_count'] = max(0, total - allocated)
-            sessions.append(session_dict)
         
         return sessions
 
@@ -313,45 +479,49 @@ class SessionQueries:
             Dict with session_id, plan_id, status, total_students, allocated_count,
             pending_count, rooms (list), batches (list), completion_rate
         """
+        _flush_pending_stats_if_any()
         db = get_db()
-        
-        # Overall stats
+
+        # Single round-trip: CTEs compute the per-room and per-batch
+        # aggregates and json_group_array folds them into one row alongside
+        # the session columns. The rooms CTE joins allocations directly so
+        # the table is scanned once instead of the old
+        # `WHERE c.id IN (SELECT DISTINCT classroom_id ...)` double scan.
         cursor = db.execute("""
-            SELECT total_students, allocated_count, status, plan_id
-            FROM allocation_sessions
-            WHERE session_id = ?
-        """, (session_id,))
-        
+            WITH room_stats AS (
+                SELECT c.name AS name,
+                       c.rows * c.cols AS capacity,
+                       COUNT(a.id) AS allocated
+                FROM allocations a
+                JOIN classrooms c ON c.id = a.classroom_id
+                WHERE a.session_id = ?
+                GROUP BY c.id
+            ),
+            batch_stats AS (
+                SELECT batch_name, COUNT(*) AS count
+                FROM allocations
+                WHERE session_id = ?
+                GROUP BY batch_name
+            )
+            SELECT s.total_students, s.allocated_count, s.status, s.plan_id,
+                   (SELECT json_group_array(json_object(
+                        'name', name, 'capacity', capacity, 'allocated', allocated))
+                    FROM room_stats) AS rooms,
+                   (SELECT json_group_array(json_object(
+                        'batch_name', batch_name, 'count', count))
+                    FROM batch_stats) AS batches
+            FROM allocation_sessions s
+            WHERE s.session_id = ?
+        """, (session_id, session_id, session_id))
+
         session_row = cursor.fetchone()
         if not session_row:
             return None
-        
+
         session_data = dict(session_row)
-        
-        # Per-room stats
-        cursor = db.execute("""
-            SELECT
-                c.name,
-                c.rows * c.cols as capacity,
-                COUNT(a.id) as allocated
-            FROM classrooms c
-            LEFT JOIN allocations a ON c.id = a.classroom_id AND a.session_id = ?
-            WHERE c.id IN (SELECT DISTINCT classroom_id FROM allocations WHERE session_id = ?)
-            GROUP BY c.id
-        """, (session_id, session_id))
-        
-        room_stats = [dict(row) for row in cursor.fetchall()]
-        
-        # Per-batch stats
-        cursor = db.execute("""
-            SELECT batch_name, COUNT(*) as count
-            FROM allocations
-            WHERE session_id = ?
-            GROUP BY batch_name
-        """, (session_id,))
-        
-        batch_stats = [dict(row) for row in cursor.fetchall()]
-        
+        room_stats = json.loads(session_data['rooms'])
+        batch_stats = json.loads(session_data['batches'])
+
         # Completion rate
         total = session_data.get('total_students') or 0
         allocated = session_data.get('allocated_count') or 0
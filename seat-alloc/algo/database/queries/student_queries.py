@@ -1,67 +1,137 @@
 from typing import List, Dict, Optional, Tuple
-from algo.database.db import get_db
+from algo.database.db import get_db, rows_as_dicts
+
+# SQL hoisted to module constants (see allocation_queries.py): one string
+# object per query keeps the sqlite3 statement cache hot.
+CREATE_UPLOAD_SQL = """
+    INSERT INTO uploads (session_id, batch_id, batch_name, original_filename, file_size, batch_color)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+BULK_INSERT_STUDENTS_SQL = """
+    INSERT OR IGNORE INTO students
+    (upload_id, batch_id, batch_name, enrollment, name, batch_color, department)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+GET_STUDENTS_BY_SESSION_SQL = """
+    SELECT s.*, u.semester
+    FROM students s
+    JOIN uploads u ON s.upload_id = u.id
+    WHERE u.session_id = ?
+"""
+
+GET_BATCH_COUNTS_SESSION_SQL = """
+    SELECT s.batch_name, COUNT(*) as count, MAX(s.batch_color) as color
+    FROM students s
+    JOIN uploads u ON s.upload_id = u.id
+    WHERE u.session_id = ?
+    GROUP BY s.batch_name
+    ORDER BY s.batch_name
+"""
+
+GET_BATCH_COUNTS_ALL_SQL = """
+    SELECT batch_name, COUNT(*) as count, MAX(batch_color) as color
+    FROM students
+    GROUP BY batch_name
+    ORDER BY batch_name
+"""
+
+DELETE_UPLOAD_BATCH_SQL = "DELETE FROM uploads WHERE id = ?"
+
+# Counts come from a scalar subquery per upload instead of LEFT JOIN +
+# GROUP BY: a session has at most a few dozen uploads, and each count is an
+# index-range scan of the UNIQUE(upload_id, enrollment) index, so the query
+# no longer materializes every matched student row before grouping.
+GET_SESSION_UPLOADS_SQL = """
+    SELECT
+        u.id as upload_id,
+        u.batch_id,
+        u.batch_name,
+        u.batch_color,
+        u.original_filename,
+        u.created_at as uploaded_at,
+        (SELECT COUNT(*) FROM students s WHERE s.upload_id = u.id) as student_count
+    FROM uploads u
+    WHERE u.session_id = ?
+    ORDER BY u.created_at DESC
+"""
+
+# Anti-join instead of NOT IN: the planner probes the UNIQUE(session_id,
+# student_id) index per candidate student rather than materializing the whole
+# subquery result (and NOT IN is NULL-unsafe). The unique constraint also
+# guarantees at most one match per student, so DISTINCT is unnecessary.
+GET_PENDING_STUDENTS_SQL = """
+    SELECT s.id, s.enrollment, s.name, s.batch_name, s.batch_id, s.batch_color, u.semester
+    FROM students s
+    JOIN uploads u ON s.upload_id = u.id
+    LEFT JOIN allocations a ON a.student_id = s.id AND a.session_id = ?
+    WHERE u.session_id = ?
+    AND a.id IS NULL
+    ORDER BY s.batch_name, s.enrollment
+"""
+
 
 class StudentQueries:
     @staticmethod
     def create_upload(session_id: int, batch_id: str, batch_name: str, filename: str, file_size: int, batch_color: str) -> int:
         db = get_db()
-        cursor = db.execute("""
-            INSERT INTO uploads (session_id, batch_id, batch_name, original_filename, file_size, batch_color)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (session_id, batch_id, batch_name, filename, file_size, batch_color))
+        cursor = db.execute(CREATE_UPLOAD_SQL, (session_id, batch_id, batch_name, filename, file_size, batch_color))
         db.commit()
         return cursor.lastrowid
 
+    # executemany feeds one row of 7 bound parameters at a time, so SQLite's
+    # variable limit is never hit — the batching just keeps parameter-buffer
+    # memory bounded and predictable for very large rebuilds.
+    BULK_INSERT_BATCH = 5000
+
     @staticmethod
     def bulk_insert_students(students_data: List[tuple]):
         """
         students_data: list of (upload_id, batch_id, batch_name, enrollment, name, color, department)
+
+        Inserts in fixed-size batches inside a single transaction, so one
+        commit/fsync covers the whole upload regardless of size.
         """
         db = get_db()
-        db.executemany("""
-            INSERT OR IGNORE INTO students 
-            (upload_id, batch_id, batch_name, enrollment, name, batch_color, department)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, students_data)
-        db.commit()
+        batch = StudentQueries.BULK_INSERT_BATCH
+        with db:
+            for i in range(0, len(students_data), batch):
+                db.executemany(BULK_INSERT_STUDENTS_SQL, students_data[i:i + batch])
+
+    @staticmethod
+    def iter_students_by_session(session_id: int):
+        """Yield session students one dict at a time.
+
+        Streams rows straight off the cursor so large cohorts never sit in
+        memory as a full list; downstream consumers (allocation, exports)
+        can start work before the query drains.
+        """
+        db = get_db()
+        cursor = db.execute(GET_STUDENTS_BY_SESSION_SQL, (session_id,))
+        cursor.row_factory = None
+        columns = [col[0] for col in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
 
     @staticmethod
     def get_students_by_session(session_id: int) -> List[Dict]:
         """Get all students associated with a session (via uploads)"""
-        db = get_db()
-        cursor = db.execute("""
-            SELECT s.*, u.semester 
-            FROM students s
-            JOIN uploads u ON s.upload_id = u.id
-            WHERE u.session_id = ?
-        """, (session_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        return list(StudentQueries.iter_students_by_session(session_id))
 
     @staticmethod
     def get_batch_counts(session_id: Optional[int] = None) -> List[Dict]:
         db = get_db()
         if session_id:
-            cursor = db.execute("""
-                SELECT s.batch_name, COUNT(*) as count, MAX(s.batch_color) as color
-                FROM students s
-                JOIN uploads u ON s.upload_id = u.id
-                WHERE u.session_id = ?
-                GROUP BY s.batch_name
-                ORDER BY s.batch_name
-            """, (session_id,))
+            cursor = db.execute(GET_BATCH_COUNTS_SESSION_SQL, (session_id,))
         else:
-            cursor = db.execute("""
-                SELECT batch_name, COUNT(*) as count, MAX(batch_color) as color
-                FROM students
-                GROUP BY batch_name
-                ORDER BY batch_name
-            """)
-        return [dict(row) for row in cursor.fetchall()]
-    
+            cursor = db.execute(GET_BATCH_COUNTS_ALL_SQL)
+        return rows_as_dicts(cursor)
+
     @staticmethod
     def delete_upload_batch(upload_id: int):
         db = get_db()
-        db.execute("DELETE FROM uploads WHERE id = ?", (upload_id,))
+        db.execute(DELETE_UPLOAD_BATCH_SQL, (upload_id,))
         # Students cascade deleted
         db.commit()
 
@@ -69,41 +139,27 @@ class StudentQueries:
     def get_session_uploads(session_id: int) -> List[Dict]:
         """
         Get all uploads/batches for a session with student counts.
-        
+
         Returns:
             List of upload dicts with upload_id, batch_id, batch_name, batch_color,
             original_filename, uploaded_at, and student_count
         """
         db = get_db()
-        cursor = db.execute("""
-            SELECT 
-                u.id as upload_id,
-                u.batch_id,
-                u.batch_name,
-                u.batch_color,
-                u.original_filename,
-                u.created_at as uploaded_at,
-                COUNT(s.id) as student_count
-            FROM uploads u
-            LEFT JOIN students s ON u.id = s.upload_id
-            WHERE u.session_id = ?
-            GROUP BY u.id
-            ORDER BY u.created_at DESC
-        """, (session_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        cursor = db.execute(GET_SESSION_UPLOADS_SQL, (session_id,))
+        return rows_as_dicts(cursor)
+
+    @staticmethod
+    def iter_pending_students(session_id: int):
+        """Yield unallocated students one dict at a time (see
+        iter_students_by_session)."""
+        db = get_db()
+        cursor = db.execute(GET_PENDING_STUDENTS_SQL, (session_id, session_id))
+        cursor.row_factory = None
+        columns = [col[0] for col in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
 
     @staticmethod
     def get_pending_students(session_id: int) -> List[Dict]:
         """Get students not yet allocated in this session."""
-        db = get_db()
-        cursor = db.execute("""
-            SELECT DISTINCT s.id, s.enrollment, s.name, s.batch_name, s.batch_id, s.batch_color, u.semester
-            FROM students s
-            JOIN uploads u ON s.upload_id = u.id
-            WHERE u.session_id = ?
-            AND s.id NOT IN (
-                SELECT student_id FROM allocations WHERE session_id = ?
-            )
-            ORDER BY s.batch_name, s.enrollment
-        """, (session_id, session_id))
-        return [dict(row) for row in cursor.fetchall()]
+        return list(StudentQueries.iter_pending_students(session_id))
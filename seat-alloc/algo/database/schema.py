@@ -8,6 +8,10 @@ from algo.config.settings import Config
 
 logger = logging.getLogger(__name__)
 
+# Bump this whenever the DDL/migrations below change so existing databases
+# re-run ensure_demo_db() once and then skip it on every later boot.
+SCHEMA_VERSION = 4
+
 def ensure_demo_db():
     """
     Initialize database with all required tables.
@@ -38,9 +42,21 @@ def ensure_demo_db():
     conn = sqlite3.connect(Config.DB_PATH, timeout=20)
     cur = conn.cursor()
     cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
     cur.execute("PRAGMA busy_timeout=20000")
 
+    # Warm-start fast path: if the stored schema version already matches,
+    # the DDL below has nothing to do — skip it entirely.
+    cur.execute("PRAGMA user_version")
+    if cur.fetchone()[0] == SCHEMA_VERSION:
+        conn.close()
+        logger.info(f"✅ Database schema up to date (version {SCHEMA_VERSION}), skipping init")
+        return
+
     try:
+        # Run all CREATE/ALTER statements in one transaction instead of one
+        # autocommit (and fsync) per statement
+        cur.execute("BEGIN")
         # ====================================================================
         # 1. USER ACTIVITY TABLE (Last activity tracking)
         # ====================================================================
@@ -259,6 +275,18 @@ def ensure_demo_db():
             );
         """)
 
+        # Match the WHERE/ORDER BY of get_user_sessions (user_id [+ status],
+        # last_activity DESC) and get_active_sessions (status IN (...),
+        # created_at DESC) so both are index-driven with no sort step
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sessions_user_activity
+            ON allocation_sessions(user_id, status, last_activity DESC);
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sessions_status_created
+            ON allocation_sessions(status, created_at DESC);
+        """)
+
         # ====================================================================
         # 4. UPLOADS TABLE (ENHANCED WITH BATCH_COLOR)
         # ====================================================================
@@ -277,6 +305,13 @@ def ensure_demo_db():
             );
         """)
 
+        # Lets the EXISTS probe in check_empty_session (and other
+        # session-scoped upload lookups) hit an index instead of scanning
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_uploads_session
+            ON uploads(session_id);
+        """)
+
         # ====================================================================
         # 5. STUDENTS TABLE (ENHANCED)
         # ====================================================================
@@ -296,6 +331,30 @@ def ensure_demo_db():
             );
         """)
 
+        # Backs the INSERT OR IGNORE dedup in commit_upload: duplicate
+        # enrollments within a batch are skipped inside SQLite instead of
+        # raising IntegrityError into Python row by row. Legacy databases may
+        # already hold duplicate (batch_id, enrollment) rows from before the
+        # index existed — clear those first (keeping the oldest row) so the
+        # CREATE UNIQUE INDEX can't turn a data wart into a boot failure.
+        # Only pay the dedup scan when the index is actually missing.
+        cur.execute("""
+            SELECT 1 FROM sqlite_master
+            WHERE type = 'index' AND name = 'ux_students_batch_enr';
+        """)
+        if cur.fetchone() is None:
+            cur.execute("""
+                DELETE FROM students
+                WHERE id NOT IN (
+                    SELECT MIN(id) FROM students
+                    GROUP BY batch_id, enrollment
+                );
+            """)
+            cur.execute("""
+                CREATE UNIQUE INDEX ux_students_batch_enr
+                ON students(batch_id, enrollment);
+            """)
+
         # ====================================================================
         # 6. CLASSROOMS TABLE (WITH USER ISOLATION)
         # ====================================================================
@@ -458,6 +517,7 @@ def ensure_demo_db():
                 # Column already exists
                 pass
 
+        cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
         logger.info(f"✅ Database initialized successfully at {Config.DB_PATH}")
         
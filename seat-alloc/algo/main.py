@@ -1,8 +1,16 @@
 # Application factory and configuration.
 # Initializes the Flask app, sets up middleware (CORS, logging), and registers API blueprints.
+import atexit
 import os
 import logging
+import queue
+import sqlite3
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import orjson
 from flask import Flask, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from algo.config.settings import Config
 from algo.database import ensure_demo_db, close_db
@@ -15,42 +23,193 @@ try:
 except ImportError:
     LIMITER_AVAILABLE = False
 
-# Import Blueprints
-from algo.api.blueprints.sessions import session_bp
-from algo.api.blueprints.students import student_bp
-from algo.api.blueprints.allocations import allocation_bp
-from algo.api.blueprints.pdf import pdf_bp
-from algo.api.blueprints.classrooms import classrooms_bp
-from algo.api.blueprints.dashboard import dashboard_bp
-from algo.api.blueprints.admin import auth_bp, admin_bp
-from algo.api.blueprints.health import health_bp
-from algo.api.blueprints.feedback import feedback_bp
-from algo.api.blueprints.database import database_bp
-from algo.api.blueprints.templates import templates_bp
-from algo.api.blueprints.master_plan_pdf import master_plan_bp
-from algo.api.blueprints.excel_export import excel_export_bp
-from algo.api.blueprints.publish_plan import publish_plan_bp
+# ─── Background activity writer ──────────────────────────────────────────────
+# The after_request tracker used to do two synchronous SQLite writes per
+# request, serializing every response behind disk I/O. Requests now only
+# enqueue events; one daemon thread drains the queue and flushes batches
+# (up to 100 events or 1s) with a single transaction per flush.
+# Polled every few seconds per client; tracking them would dominate the
+# activity table with noise. Tuple form makes startswith a single C call.
+_SKIP_TRACKING_PATHS = ('/api/health', '/api/sessions/active', '/api/dashboard/stats')
+
+# Fail-fast filters for track_activity: static assets and preflight/HEAD
+# probes never produce meaningful activity, so bail before any other work.
+_SKIP_PREFIXES = ('/static', '/favicon.ico')
+_SKIP_METHODS = frozenset({'OPTIONS', 'HEAD'})
+
+# Blueprint manifest: (module path, blueprint attributes). create_app
+# imports each module on demand and skips entries whose optional
+# dependencies (reportlab, openpyxl, pandas) are missing, so a feature
+# degrades to a warning instead of preventing startup.
+BLUEPRINT_SPECS = [
+    ('algo.api.blueprints.database', ('database_bp',)),
+    ('algo.api.blueprints.sessions', ('session_bp',)),
+    ('algo.api.blueprints.students', ('student_bp',)),
+    ('algo.api.blueprints.allocations', ('allocation_bp',)),
+    ('algo.api.blueprints.pdf', ('pdf_bp',)),
+    ('algo.api.blueprints.classrooms', ('classrooms_bp',)),
+    ('algo.api.blueprints.dashboard', ('dashboard_bp',)),
+    ('algo.api.blueprints.admin', ('auth_bp', 'admin_bp')),
+    ('algo.api.blueprints.feedback', ('feedback_bp',)),
+    ('algo.api.blueprints.templates', ('templates_bp',)),
+    ('algo.api.blueprints.master_plan_pdf', ('master_plan_bp',)),
+    ('algo.api.blueprints.excel_export', ('excel_export_bp',)),
+    ('algo.api.blueprints.publish_plan', ('publish_plan_bp',)),
+    ('algo.api.blueprints.plans', ('plans_bp',)),
+    ('algo.api.blueprints.health', ('health_bp',)),
+]
+
+# Human-readable labels for important endpoints, grouped by method with
+# longest prefix first so the per-request lookup only walks the handful of
+# prefixes for that method instead of rebuilding and scanning the whole map.
+_ACTION_MAP = {
+    ('POST', '/api/upload'): 'Uploaded student file',
+    ('POST', '/api/sessions/start'): 'Started new session',
+    ('POST', '/api/generate-seating'): 'Generated seating plan',
+    ('POST', '/api/generate-pdf'): 'Generated PDF',
+    ('POST', '/api/classrooms'): 'Created classroom',
+    ('DELETE', '/api/classrooms'): 'Deleted classroom',
+    ('DELETE', '/api/sessions'): 'Deleted session',
+    ('POST', '/api/allocate'): 'Allocated students',
+}
+
+_ACTION_PREFIXES = {}
+for (_method, _prefix), _action in _ACTION_MAP.items():
+    _ACTION_PREFIXES.setdefault(_method, []).append((_prefix, _action))
+for _method in _ACTION_PREFIXES:
+    _ACTION_PREFIXES[_method].sort(key=lambda pair: -len(pair[0]))
+
+_ACTIVITY_BATCH_MAX = 100
+_ACTIVITY_FLUSH_INTERVAL = 1.0  # seconds
+_activity_queue = queue.Queue()
+_activity_worker_lock = threading.Lock()
+_activity_worker_started = False
+
+_LOG_ACTION_SQL = """
+    INSERT INTO user_activity_log (user_id, action, details, endpoint, ip_address)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_TRACK_ACTIVITY_SQL = """
+    INSERT INTO user_activity (user_id, last_activity, last_endpoint)
+    VALUES (?, CURRENT_TIMESTAMP, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        last_activity = CURRENT_TIMESTAMP,
+        last_endpoint = excluded.last_endpoint
+"""
+
+
+def _enqueue_activity(kind, row):
+    """Queue an activity event; kind is 'log' or 'track'."""
+    _activity_queue.put((kind, str(Config.DB_PATH), row))
+
+
+def _activity_worker():
+    while True:
+        try:
+            batch = [_activity_queue.get()]
+            deadline = time.monotonic() + _ACTIVITY_FLUSH_INTERVAL
+            while len(batch) < _ACTIVITY_BATCH_MAX:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(_activity_queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            # Group by DB path (tests repoint Config.DB_PATH) and flush each
+            # group as one transaction
+            by_path = {}
+            for kind, db_path, row in batch:
+                by_path.setdefault(db_path, {'log': [], 'track': []})[kind].append(row)
+
+            for db_path, rows in by_path.items():
+                conn = sqlite3.connect(db_path, timeout=20)
+                try:
+                    if rows['log']:
+                        conn.executemany(_LOG_ACTION_SQL, rows['log'])
+                    if rows['track']:
+                        conn.executemany(_TRACK_ACTIVITY_SQL, rows['track'])
+                    conn.commit()
+                finally:
+                    conn.close()
+        except Exception:
+            # Activity logging must never take the worker (or app) down
+            pass
+
+
+def _start_activity_worker():
+    global _activity_worker_started
+    with _activity_worker_lock:
+        if _activity_worker_started:
+            return
+        worker = threading.Thread(target=_activity_worker,
+                                  name='activity-writer', daemon=True)
+        worker.start()
+        _activity_worker_started = True
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Every jsonify()/request.get_json() call in the app goes through this,
+    so responses encode in native code instead of stdlib json. default=str
+    mirrors Flask's lenient handling of types orjson doesn't know, and
+    OPT_NON_STR_KEYS matches stdlib json's coercion of int-keyed dicts
+    (batch counts, roll maps) that several endpoints return.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+# ─── Logging ─────────────────────────────────────────────────────────────────
+# Loggers only push records onto an in-process queue; a QueueListener thread
+# owns the real file/console handlers, so disk latency (the FileHandler
+# flushes every record) never blocks a request. Started once per process.
+_log_listener = None
+_log_listener_lock = threading.Lock()
+
+
+def _setup_logging():
+    global _log_listener
+    with _log_listener_lock:
+        if _log_listener is not None:
+            return
+        # Use UTF-8 for console handler to support emoji on Windows
+        console_handler = logging.StreamHandler()
+        if hasattr(console_handler.stream, 'reconfigure'):
+            console_handler.stream.reconfigure(encoding='utf-8')
+        file_handler = RotatingFileHandler(
+            Config.LOG_FILE, maxBytes=10_000_000, backupCount=5, encoding='utf-8'
+        )
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        console_handler.setFormatter(formatter)
+        file_handler.setFormatter(formatter)
+
+        log_queue = queue.Queue(-1)
+        queue_handler = QueueHandler(log_queue)
+        # Pass records through verbatim; the listener's handlers do the real
+        # formatting (basicConfig would otherwise bake its default prefix in)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+        _log_listener = QueueListener(log_queue, file_handler, console_handler)
+        _log_listener.start()
+        atexit.register(_log_listener.stop)
 
 
 def create_app(test_config=None):
-    # Setup Logging (use UTF-8 for console handler to support emoji on Windows)
-    import sys as _sys
-    console_handler = logging.StreamHandler()
-    if hasattr(console_handler.stream, 'reconfigure'):
-        console_handler.stream.reconfigure(encoding='utf-8')
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(Config.LOG_FILE, encoding='utf-8'),
-            console_handler
-        ]
-    )
+    _setup_logging()
     logger = logging.getLogger(__name__)
     logger.info("Initializing Modular Flask Application...")
     
     app = Flask(__name__, instance_relative_config=True)
-    
+    app.json = OrjsonProvider(app)
+
     # Configuration
     app.config.from_object(Config)
     if test_config:
@@ -62,55 +221,78 @@ def create_app(test_config=None):
     except OSError:
         pass
         
-    # Extensions - CORS with environment-aware origins
+    # Extensions - CORS with environment-aware origins.
+    # max_age lets browsers cache the OPTIONS preflight (24h default), so
+    # each cross-origin POST from the SPA costs one round-trip, not two.
+    cors_max_age = int(os.getenv('CORS_MAX_AGE', 86400))
     allowed_origins = os.getenv('ALLOWED_ORIGINS', '*')
     if allowed_origins != '*':
         # Parse comma-separated origins for production
         origins_list = [o.strip() for o in allowed_origins.split(',')]
-        CORS(app, resources={r"/api/*": {"origins": origins_list}})
+        CORS(app, resources={r"/api/*": {"origins": origins_list}}, max_age=cors_max_age)
         logger.info(f"CORS configured for: {origins_list}")
     else:
         # Development mode - allow all (log warning in production)
-        CORS(app, resources={r"/api/*": {"origins": "*"}})
+        CORS(app, resources={r"/api/*": {"origins": "*"}}, max_age=cors_max_age)
         if os.getenv('FLASK_ENV') == 'production':
             logger.warning("⚠️  CORS allows all origins! Set ALLOWED_ORIGINS in production.")
     
-    # Rate Limiting - protect auth endpoints from brute force
+    # Rate Limiting - protect auth endpoints from brute force.
+    # memory:// is per-process, so under multiple gunicorn workers limits
+    # drift; when the deployment has Redis (REDIS_URL) reuse it for shared,
+    # atomic counters unless RATELIMIT_STORAGE_URL says otherwise.
     if LIMITER_AVAILABLE:
+        storage_uri = (os.getenv('RATELIMIT_STORAGE_URL')
+                       or os.getenv('REDIS_URL')
+                       or 'memory://')
+        limiter_kwargs = {}
+        if storage_uri.startswith('redis'):
+            # Sorted-set based sliding window; only meaningful (and only
+            # supported) on shared storage backends
+            limiter_kwargs['strategy'] = 'moving-window'
         limiter = Limiter(
             get_remote_address,
             app=app,
             default_limits=["200 per day", "50 per hour"],
-            storage_uri=os.getenv('RATELIMIT_STORAGE_URL', 'memory://'),
+            storage_uri=storage_uri,
+            **limiter_kwargs,
         )
         # Store limiter on app for use in blueprints
         app.limiter = limiter
-        logger.info("✅ Rate limiting enabled")
+        logger.info(f"✅ Rate limiting enabled (storage: {storage_uri.split('://')[0]}://)")
     else:
         app.limiter = None
         logger.warning("⚠️  Flask-Limiter not installed. Rate limiting disabled.")
     
-    # Database Setup
+    # Database Setup — the schema must exist before the app serves traffic,
+    # so ensure_demo_db stays synchronous
     with app.app_context():
         ensure_demo_db()
-        
-        # Auto-expire stale sessions on startup
-        try:
-            from algo.services.session_service import SessionService
-            result = SessionService.auto_expire_stale_sessions()
-            if result.get('expired_count', 0) > 0:
-                logger.info(f"⏰ Startup: Auto-expired {result['expired_count']} stale session(s)")
-        except Exception as e:
-            logger.warning(f"Could not auto-expire stale sessions: {e}")
-        
-        # Cleanup old activity logs (7-day retention)
-        try:
-            from algo.services.activity_service import ActivityService
-            deleted = ActivityService.cleanup_old_logs()
-            if deleted > 0:
-                logger.info(f"🧹 Startup: Cleaned up {deleted} old activity log entries")
-        except Exception as e:
-            logger.warning(f"Could not cleanup old activity logs: {e}")
+
+    # Startup housekeeping only touches stale rows, so it runs on a daemon
+    # thread instead of blocking worker boot (with several gunicorn workers
+    # the synchronous version multiplied DB contention at cold start)
+    def _startup_housekeeping():
+        with app.app_context():
+            # Auto-expire stale sessions on startup
+            try:
+                from algo.services.session_service import SessionService
+                result = SessionService.auto_expire_stale_sessions()
+                if result.get('expired_count', 0) > 0:
+                    logger.info(f"⏰ Startup: Auto-expired {result['expired_count']} stale session(s)")
+            except Exception as e:
+                logger.warning(f"Could not auto-expire stale sessions: {e}")
+
+            # Cleanup old activity logs (7-day retention)
+            try:
+                from algo.services.activity_service import ActivityService
+                deleted = ActivityService.cleanup_old_logs()
+                if deleted > 0:
+                    logger.info(f"🧹 Startup: Cleaned up {deleted} old activity log entries")
+            except Exception as e:
+                logger.warning(f"Could not cleanup old activity logs: {e}")
+
+    threading.Thread(target=_startup_housekeeping, name='startup-housekeeping', daemon=True).start()
 
     # Start automatic data cleanup scheduler (runs every 20 days)
     try:
@@ -123,32 +305,28 @@ def create_app(test_config=None):
     def teardown_db(exception):
         close_db(exception)
         
-    # Register Blueprints
-    app.register_blueprint(database_bp)
-    app.register_blueprint(session_bp)
-    app.register_blueprint(student_bp)
-    app.register_blueprint(allocation_bp)
-    app.register_blueprint(pdf_bp)
-    app.register_blueprint(classrooms_bp)
-    app.register_blueprint(dashboard_bp)
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(admin_bp)
-    app.register_blueprint(feedback_bp)
-    app.register_blueprint(templates_bp)
-    app.register_blueprint(master_plan_bp)
-    app.register_blueprint(excel_export_bp)
-    app.register_blueprint(publish_plan_bp)
-    
-    from algo.api.blueprints.plans import plans_bp
-    app.register_blueprint(plans_bp)
-    app.register_blueprint(health_bp)
-    
-    # Global Activity Tracking (Middleware)
-    from algo.database.queries.user_queries import UserQueries
+    # Register Blueprints from the manifest. Modules are imported here
+    # rather than at module scope: several pull in heavy dependencies
+    # (pandas, reportlab, openpyxl) at import time, so deferring them keeps
+    # 'from algo.main import ...' cheap for CLI tools and test collection
+    # that never build the app. A blueprint whose optional dependency is
+    # missing is skipped with a warning instead of taking the app down.
+    import importlib
+    for mod_path, attrs in BLUEPRINT_SPECS:
+        try:
+            mod = importlib.import_module(mod_path)
+            for attr in attrs:
+                app.register_blueprint(getattr(mod, attr))
+        except ImportError as e:
+            logger.warning(f"⚠️  Skipping blueprint(s) {attrs} from {mod_path}: {e}")
     
+    # Global Activity Tracking (Middleware) — writes happen on the
+    # background activity worker, never on the request path
+    _start_activity_worker()
+
     @app.after_request
     def track_activity(response):
-        if request.path.startswith('/static') or request.method == 'OPTIONS':
+        if request.method in _SKIP_METHODS or request.path.startswith(_SKIP_PREFIXES):
             return response
         
         # Use request.user_id if available (after token_required)
@@ -156,55 +334,32 @@ def create_app(test_config=None):
         if not user_id:
             return response
         
-        # Skip logging for high-frequency polling endpoints
-        skip_paths = ['/api/health', '/api/sessions/active', '/api/dashboard/stats']
-        if any(request.path.startswith(p) for p in skip_paths):
-            try:
-                UserQueries.track_activity(user_id, request.path)
-            except Exception:
-                pass
+        # High-frequency polling endpoints: no tracking at all
+        if request.path.startswith(_SKIP_TRACKING_PATHS):
             return response
         
         # Log significant actions to user activity log (for user-specific history)
         try:
-            from algo.services.activity_service import ActivityService
-            
             # Determine action description based on method and path
             action = f"{request.method} {request.path}"
             
             # Only log successful requests for meaningful actions
             if response.status_code < 400:
-                # Create human-readable action for important endpoints
-                action_map = {
-                    ('POST', '/api/upload'): 'Uploaded student file',
-                    ('POST', '/api/sessions/start'): 'Started new session',
-                    ('POST', '/api/generate-seating'): 'Generated seating plan',
-                    ('POST', '/api/generate-pdf'): 'Generated PDF',
-                    ('POST', '/api/classrooms'): 'Created classroom',
-                    ('DELETE', '/api/classrooms'): 'Deleted classroom',
-                    ('DELETE', '/api/sessions'): 'Deleted session',
-                    ('POST', '/api/allocate'): 'Allocated students',
-                }
-                
-                for (method, path_prefix), readable_action in action_map.items():
-                    if request.method == method and request.path.startswith(path_prefix):
+                # Human-readable action for important endpoints
+                for path_prefix, readable_action in _ACTION_PREFIXES.get(request.method, ()):
+                    if request.path.startswith(path_prefix):
                         action = readable_action
                         break
-                
-                ActivityService.log_action(
-                    user_id=user_id,
-                    action=action,
-                    endpoint=request.path,
-                    ip_address=request.remote_addr
-                )
+
+                _enqueue_activity('log', (user_id, action, None, request.path, request.remote_addr))
         except Exception:
             pass  # Fail silently - logging should not break the app
-        
+
         try:
-            UserQueries.track_activity(user_id, request.path)
+            _enqueue_activity('track', (user_id, request.path))
         except Exception:
             pass  # Fail silently
-        
+
         return response
 
     @app.after_request
@@ -216,7 +371,17 @@ def create_app(test_config=None):
 
     return app
 
-app = create_app()
+# The WSGI app is built lazily (PEP 562 module __getattr__):
+# `from algo.main import app` and `gunicorn algo.main:app` behave as before,
+# but importing this module just for create_app (tests, tooling, scripts) no
+# longer runs migrations and startup housekeeping as an import side effect.
+def __getattr__(name):
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
-    app.run(debug=True, port=8000)
\ No newline at end of file
+    create_app().run(debug=True, port=8000)
\ No newline at end of file
@@ -5,47 +5,50 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATABASE_PATH = os.path.join(BASE_DIR, "data", "pdf_templates.db")
 
+# All DDL in one script so startup issues a single executescript call
+# (one fsync under WAL) instead of a round trip per statement.
+SCHEMA_DDL = '''
+    CREATE TABLE IF NOT EXISTS user_templates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        template_name TEXT NOT NULL DEFAULT 'default',
+        dept_name TEXT,
+        exam_details TEXT,
+        seating_plan_title TEXT,
+        current_year INTEGER,
+        branch_text TEXT,
+        room_number TEXT,
+        coordinator_name TEXT,
+        coordinator_title TEXT,
+        banner_image_path TEXT,
+        attendance_dept_name TEXT,
+        attendance_year INTEGER,
+        attendance_exam_heading TEXT,
+        attendance_banner_path TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(user_id, template_name)
+    );
+'''
+
 def init_database():
     """Initialize the database with required tables"""
     # Ensure directory exists
     os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-    
+
     conn = sqlite3.connect(DATABASE_PATH, timeout=20)
     cursor = conn.cursor()
     cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute("PRAGMA busy_timeout=20000")
-    
-    # Create user_templates table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_templates (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            template_name TEXT NOT NULL DEFAULT 'default',
-            dept_name TEXT,
-            exam_details TEXT,
-            seating_plan_title TEXT,
-            current_year INTEGER,
-            branch_text TEXT,
-            room_number TEXT,
-            coordinator_name TEXT,
-            coordinator_title TEXT,
-            banner_image_path TEXT,
-            attendance_dept_name TEXT,
-            attendance_year INTEGER,
-            attendance_exam_heading TEXT,
-            attendance_banner_path TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(user_id, template_name)
-        )
-    ''')
-    
-    
+
+    # Create tables (single script, single commit)
+    conn.executescript(SCHEMA_DDL)
+
     # Migration: Add missing columns if they don't exist
     try:
         cursor.execute("PRAGMA table_info(user_templates)")
         columns = [column[1] for column in cursor.fetchall()]
-        
+
         # List of columns that should exist
         required_columns = {
             'current_year': ('INTEGER', '2024'),
@@ -54,25 +57,25 @@ def init_database():
             'attendance_exam_heading': ('TEXT', "'SESSIONAL EXAMINATION'"),
             'attendance_banner_path': ('TEXT', "''")
         }
-        
-        migrations_applied = []
-        for col_name, (col_type, default_val) in required_columns.items():
-            if col_name not in columns:
-                print(f"🔧 Migrating database: Adding {col_name} column...")
-                cursor.execute(f'''
-                    ALTER TABLE user_templates 
-                    ADD COLUMN {col_name} {col_type} DEFAULT {default_val}
-                ''')
-                migrations_applied.append(col_name)
-        
-        if migrations_applied:
-            print(f"✅ Migration complete: Added columns: {', '.join(migrations_applied)}")
-        
+
+        alter_stmts = [
+            f"ALTER TABLE user_templates ADD COLUMN {col_name} {col_type} DEFAULT {default_val}"
+            for col_name, (col_type, default_val) in required_columns.items()
+            if col_name not in columns
+        ]
+
+        if alter_stmts:
+            migrating = ', '.join(stmt.split(' ADD COLUMN ')[1].split()[0] for stmt in alter_stmts)
+            print(f"🔧 Migrating database: Adding columns: {migrating}...")
+            # One script = one transaction for the whole migration
+            conn.executescript(";\n".join(alter_stmts))
+            print(f"✅ Migration complete: Added columns: {migrating}")
+
     except Exception as e:
         print(f"⚠️ Migration check warning: {e}")
-    
+
     system_banner_path = os.path.join(BASE_DIR, "data", "banner.png")
-    
+
     # Insert system default template if not exists
     cursor.execute('''
         INSERT OR IGNORE INTO user_templates (
@@ -89,9 +92,9 @@ def init_database():
         'Room no. 103A',
         'Dr. Dheeraj K. Dixit',
         'Dept. Exam Coordinator',
-        os.path.join(BASE_DIR, 'data', 'banner.png')
+        system_banner_path
     ))
-    
+
     conn.commit()
     conn.close()
     print("✅ Database initialized and repaired successfully")
@@ -1,14 +1,32 @@
 # pdf_gen/pdf_generation.py (UPDATED VERSION )
+import copy
+import functools
 import io
 import json
+import logging
 import os
 import hashlib
+import re
+import stat
+from collections import OrderedDict
+from itertools import accumulate
+from threading import RLock
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import cm, mm
 from reportlab.pdfgen import canvas
 from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.lib.utils import ImageReader
+
+# orjson sorts keys and emits UTF-8 bytes in C; stdlib json stays as a
+# fallback so this module keeps working standalone
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
 
 # Import template manager with proper error handling
 try:
@@ -17,7 +35,7 @@ except ImportError:
     try:
         from template_manager import template_manager
     except ImportError:
-        print("⚠️ Template manager not available, using fallback mode")
+        logger.warning("⚠️ Template manager not available, using fallback mode")
         template_manager = None
 
 # Resolve absolute paths relative to this file
@@ -26,58 +44,176 @@ CACHE_DIR = os.path.join(PDF_GEN_DIR, "seat_plan_generated")
 IMAGE_PATH = os.path.join(PDF_GEN_DIR, "data", "banner.png")
 CUSTOM_PAGE_SIZE = (364 * mm, 235 * mm)
 
+# The base cache dir is created once at import; per-user subdirectories are
+# created lazily on first miss and remembered here, so cache-hit requests
+# skip the makedirs stat entirely
+os.makedirs(CACHE_DIR, exist_ok=True)
+_KNOWN_CACHE_DIRS = {CACHE_DIR}
+
+# Placeholder strings that sometimes leak into roll_number fields; seats
+# carrying these never count toward allocation totals
+_INVALID_ROLL_VALUES = frozenset({'BROKEN', 'NONE', 'NULL', 'UNUSED', 'N/A', 'VOID'})
+
+# Branch-prefix patterns, compiled once: new format BTCS24O1138 → BTCS,
+# old format 0901CD231014 → CD
+_PREFIX_NEW_RE = re.compile(r'^([A-Z]+)')
+_PREFIX_OLD_RE = re.compile(r'^\d+([A-Z]+)')
+
+# Banner images decoded once per path and reused: drawImage with a filesystem
+# path makes ReportLab re-decode the PNG on every page of every PDF, and the
+# banner repeats on each page. Keyed by resolved absolute path, so a handful
+# of entries at most (system default + per-user banners).
+_IMAGE_READER_CACHE = {}
+
+
+@functools.lru_cache(maxsize=32)
+def _is_regular_file(path: str) -> bool:
+    """One os.stat instead of the exists+isfile double syscall.
+
+    Memoized because header_and_footer probes the same banner paths on
+    every page; banner files change by upload (new path) or restart, so
+    staleness isn't a concern.
+    """
+    try:
+        return stat.S_ISREG(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+# L1 cache of finished PDF bytes, keyed by (payload digest, room_no).
+# Bounded LRU: 64 plans at a few hundred KB each stays in the tens of MB.
+# The digest already folds in the user's template hash, so template edits
+# miss naturally. Bytes are immutable — each hit wraps them in a fresh
+# BytesIO without copying.
+_PDF_BYTES_CACHE_MAX = 64
+_PDF_BYTES_CACHE = OrderedDict()  # (digest, room_no) -> bytes
+_pdf_bytes_cache_lock = RLock()
+
+
+def _pdf_cache_get(key):
+    with _pdf_bytes_cache_lock:
+        pdf_bytes = _PDF_BYTES_CACHE.get(key)
+        if pdf_bytes is not None:
+            _PDF_BYTES_CACHE.move_to_end(key)
+        return pdf_bytes
+
+
+def _pdf_cache_put(key, pdf_bytes):
+    with _pdf_bytes_cache_lock:
+        _PDF_BYTES_CACHE[key] = pdf_bytes
+        _PDF_BYTES_CACHE.move_to_end(key)
+        while len(_PDF_BYTES_CACHE) > _PDF_BYTES_CACHE_MAX:
+            _PDF_BYTES_CACHE.popitem(last=False)
+
+
+# Paragraph styles are immutable in practice — Paragraphs read them without
+# mutating — so build the six styles once instead of cloning per PDF.
+_STYLES = getSampleStyleSheet()
+
+
+def _make_style(base, name, **attrs):
+    style = _STYLES[base].clone(name)
+    for attr, value in attrs.items():
+        setattr(style, attr, value)
+    return style
+
+
+_CELL_STYLE = _make_style('Normal', 'Cell', fontSize=9, alignment=1, leading=12, fontName='Helvetica-Bold')
+_HEADER_STYLE = _make_style('Normal', 'Header', fontSize=12, alignment=1, fontName='Helvetica-Bold')
+_DEPT_STYLE = _make_style('Normal', 'Dept', fontSize=13, alignment=1)
+_EXAM_STYLE = _make_style('Normal', 'Exam', fontSize=12, alignment=1)
+_TITLE_STYLE = _make_style('Heading4', 'Title', alignment=1, fontSize=18)
+_BR_STYLE = _make_style('Normal', 'BR', fontSize=12, fontName='Helvetica-Bold')
+
+
+def _extract_branch_prefix(roll_no):
+    """Extract branch prefix for mixed-batch detection (handles both roll formats)."""
+    roll = str(roll_no).strip().upper()
+    m = _PREFIX_NEW_RE.match(roll)
+    if m:
+        return m.group(1)
+    m = _PREFIX_OLD_RE.match(roll)
+    if m:
+        return m.group(1)
+    return roll[:4]
+
+def _canonical_payload(data: dict) -> bytes:
+    """Serialize the seating payload to canonical (sorted-key) bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+@functools.lru_cache(maxsize=512)
+def _digest_cached(canonical: bytes, user_id: str, template_name: str, template_hash) -> str:
+    """Hash canonical payload bytes plus the template qualifier.
+
+    Memoized: previews and refetches hit this with identical arguments in
+    short windows, and the lru_cache turns those repeats into a dict probe
+    instead of re-hashing the whole payload.
+    """
+    # blake2b: this is a cache key, not a security boundary, and blake2 is
+    # considerably faster than SHA-256 on these payload sizes. Feeding the
+    # hasher piecewise also avoids concatenating payload + template info
+    # into one big intermediate string.
+    h = hashlib.blake2b(digest_size=32)
+    h.update(canonical)
+    if template_hash is not None:
+        h.update(f"|{user_id}|{template_name}|{template_hash}".encode('utf-8'))
+    return h.hexdigest()
+
+
 def seating_payload_digest(data: dict, user_id: str = 'system', template_name: str = 'default') -> str:
     """Create hash including user template configuration"""
-    seating_data_normalized = json.dumps(data, sort_keys=True, separators=(',', ':'))
-    
+    # The template hash participates in the memo key, so a template edit
+    # (which changes get_template_hash) naturally produces a fresh digest.
     if template_manager:
         template_hash = template_manager.get_template_hash(user_id, template_name)
-        combined = f"{seating_data_normalized}|{user_id}|{template_name}|{template_hash}"
     else:
-        # Fallback without template system
-        combined = seating_data_normalized
-    
-    return hashlib.sha256(combined.encode('utf-8')).hexdigest()
+        template_hash = None
+    return _digest_cached(_canonical_payload(data), user_id, template_name, template_hash)
+
+def _extract_room_no(data: dict):
+    """Room number from metadata, else from the first allocated seat carrying one."""
+    room_no = data.get('metadata', {}).get('room_no')
+    if room_no:
+        return room_no
+    return next(
+        (seat.get('room_no')
+         for row in data.get('seating', ())
+         for seat in row
+         if seat and not seat.get('is_broken') and not seat.get('is_unallocated') and seat.get('room_no')),
+        None
+    )
+
 
 def get_or_create_seating_pdf(data: dict, user_id: str = 'system', template_name: str = 'default', cache_dir: str = CACHE_DIR) -> str:
     """Generate PDF with user-specific template and caching"""
     if data is None:
         raise ValueError("Seating data required")
 
-    # Extract room number from seating data
-    room_no = None
-    # Try metadata first
-    if 'metadata' in data and 'room_no' in data['metadata']:
-        room_no = data['metadata']['room_no']
-    # Fallback: extract from first student record
-    elif 'seating' in data:
-        for row in data['seating']:
-            for seat in row:
-                if seat and not seat.get('is_broken') and not seat.get('is_unallocated'):
-                    room_no = seat.get('room_no')
-                    if room_no:
-                        break
-            if room_no:
-                break
+    room_no = _extract_room_no(data)
 
     digest = seating_payload_digest(data, user_id, template_name)
     
-    # Create user-specific cache directory if template manager available
+    # Use a user-specific cache directory if template manager available
     if template_manager and user_id != 'system':
-        user_cache_dir = os.path.join(cache_dir, str(user_id))
-        os.makedirs(user_cache_dir, exist_ok=True)
-        filename = os.path.join(user_cache_dir, f"seating_plan_{digest}.pdf")
+        target_dir = os.path.join(cache_dir, str(user_id))
     else:
         # Fallback to original behavior
-        os.makedirs(cache_dir, exist_ok=True)
-        filename = os.path.join(cache_dir, f"seating_plan_{digest}.pdf")
+        target_dir = cache_dir
+    filename = os.path.join(target_dir, f"seating_plan_{digest}.pdf")
 
-    if not os.path.exists(filename):
-        print(f"🔄 Generating new PDF for user: {user_id}")
-        create_seating_pdf(filename=filename, data=data, user_id=user_id, template_name=template_name, room_no=room_no)
-    else:
-        print(f"♻️ Using cached PDF for user: {user_id}")
-    
+    # Hit path first: an existing file implies its directory exists
+    if os.path.exists(filename):
+        logger.debug("♻️ Using cached PDF for user: %s", user_id)
+        return filename
+
+    if target_dir not in _KNOWN_CACHE_DIRS:
+        os.makedirs(target_dir, exist_ok=True)
+        _KNOWN_CACHE_DIRS.add(target_dir)
+
+    logger.debug("🔄 Generating new PDF for user: %s", user_id)
+    create_seating_pdf(filename=filename, data=data, user_id=user_id, template_name=template_name, room_no=room_no)
     return filename
 
 def process_seating_data(json_data):
@@ -97,13 +233,17 @@ def process_seating_data(json_data):
         'batch_roll_ranges': {}  # batch_label -> {'rolls': [...]}
     }
 
-    for r in range(num_rows):
-        if r >= len(seating_rows): continue
-        row = seating_rows[r]
-        for c in range(num_cols):
-            if c >= len(row): continue
-            seat = row[c]
-            
+    # Hoist the summary sub-dicts out of the loop: the nested cell walk is
+    # pure interpreter work, so every avoided dict probe per cell counts
+    batch_counts = summary['batch_counts']
+    batch_roll_ranges = summary['batch_roll_ranges']
+
+    # Iterate the data that actually exists (slices clamp to the declared
+    # grid) instead of range()+indexing with per-cell bounds checks; cells
+    # beyond the data keep their blank placeholder from the prefill above
+    for r, row in enumerate(seating_rows[:num_rows]):
+        matrix_row = matrix[r]
+        for c, seat in enumerate(row[:num_cols]):
             if seat.get('is_broken'):
                 content = seat.get('display', 'BROKEN')
                 bg = seat.get('color', '#FF0000')
@@ -115,63 +255,50 @@ def process_seating_data(json_data):
                 pset = seat.get('paper_set', '')
                 content = f"{roll}\nSET {pset}" if roll else ''
                 bg = seat.get('color')
-                
-                
+
                 if roll:
                     # Filter out invalid roll numbers that might be present in data
                     roll_str = str(roll).strip().upper()
-                    invalid_values = {'BROKEN', 'NONE', 'NULL', 'UNUSED', 'N/A', 'VOID'}
-                    
-                    if roll_str not in invalid_values:
+                    if roll_str not in _INVALID_ROLL_VALUES:
                         summary['total_allocated'] += 1
                         label = seat.get('batch_label') or f"Batch {seat.get('batch', 'Unknown')}"
-                        summary['batch_counts'][label] = summary['batch_counts'].get(label, 0) + 1
-                        
+                        batch_counts[label] = batch_counts.get(label, 0) + 1
+
                         # Track roll numbers for range calculation
-                        if label not in summary['batch_roll_ranges']:
-                            summary['batch_roll_ranges'][label] = {'rolls': []}
-                        summary['batch_roll_ranges'][label]['rolls'].append(roll_str)
-                
-            matrix[r][c] = {'text': content, 'bg': bg}
-    
-    # Process roll number ranges - sort and extract first/last
-    import re
-
-    def extract_branch_prefix(roll_no):
-        """Extract branch prefix for mixed-batch detection (handles both roll formats).
-        New format: BTCS24O1138 → BTCS | Old format: 0901CD231014 → CD"""
-        roll = str(roll_no).strip().upper()
-        m = re.match(r'^([A-Z]+)', roll)
-        if m:
-            return m.group(1)
-        m = re.match(r'^\d+([A-Z]+)', roll)
-        if m:
-            return m.group(1)
-        return roll[:4]
+                        if label not in batch_roll_ranges:
+                            batch_roll_ranges[label] = {'rolls': []}
+                        batch_roll_ranges[label]['rolls'].append(roll_str)
 
+            matrix_row[c] = {'text': content, 'bg': bg}
+    
+    # Process roll number ranges - only the endpoints are needed, so
+    # lexicographic min/max (O(N)) replaces a full sort (O(N log N)); they
+    # pick the same endpoints for both old (0901CD...) and new (BTCS...)
+    # formats, where numeric-only suffix comparison fails across year prefixes
     for label, range_info in summary['batch_roll_ranges'].items():
         rolls = range_info['rolls']
         if rolls:
-            # Sort lexicographically — works correctly for both old (0901CD...) and
-            # new (BTCS...) formats; numeric-only suffix sort fails across year prefixes
-            sorted_rolls = sorted(rolls)
-            range_info['first'] = sorted_rolls[0]
-            range_info['last'] = sorted_rolls[-1]
+            range_info['first'] = min(rolls)
+            range_info['last'] = max(rolls)
             # If multiple branch prefixes exist → lateral/interbranch mix → show 'onwards'
-            prefixes = set(extract_branch_prefix(r) for r in sorted_rolls)
+            prefixes = {_extract_branch_prefix(r) for r in rolls}
             range_info['is_onwards'] = len(prefixes) > 1
     
-    # Extract branch information with year and degree from batches data
+    # Extract branch information with year and degree from batches data.
+    # This stays a separate pass over the room's batches dict (a few entries,
+    # not the seat matrix): seat batch_labels don't reliably match the
+    # batches keys — seats fall back to "Batch {n}" — so deriving this from
+    # the seat loop could silently drop combos for a whole batch.
     batches_data = json_data.get('batches', {})
     deg_branch_year_combos = set()  # e.g., ("B.Tech", "CS", "2024"), ("M.Tech", "CS", "2023")
-    
-    for batch_label, batch_info in batches_data.items():
+
+    for batch_info in batches_data.values():
         info = batch_info.get('info', {})
-        if info.get('branch') and info.get('joining_year') and info.get('degree'):
-            deg_branch_year_combos.add((info['degree'], info['branch'], info['joining_year']))
-        elif info.get('branch') and info.get('joining_year'):
-             # Fallback if somehow degree is missing but we know it's a branch
-             deg_branch_year_combos.add(("B.Tech", info['branch'], info['joining_year']))
+        branch = info.get('branch')
+        joining_year = info.get('joining_year')
+        if branch and joining_year:
+            # Degree falls back to B.Tech for cache entries predating the field
+            deg_branch_year_combos.add((info.get('degree') or "B.Tech", branch, joining_year))
     
     # Store branch-year info in summary
     summary['branch_year_info'] = {
@@ -179,6 +306,17 @@ def process_seating_data(json_data):
     }
     
     return matrix, summary
+@functools.lru_cache(maxsize=4096)
+def _cell_paragraph(text, style):
+    """Parse a cell's markup once per unique (text, style) pair.
+
+    Paragraph construction runs ReportLab's XML mini-parser; grids repeat
+    the same strings constantly (BROKEN, UNALLOC, regenerated rolls), so
+    caching collapses that to O(unique cells).
+    """
+    return Paragraph(text, style)
+
+
 def format_cell_content(raw, style):
     if not raw.strip():
         return ''
@@ -187,7 +325,10 @@ def format_cell_content(raw, style):
         text = f"<b>{parts[0]}</b><br/>{parts[1]}"
     else:
         text = f"<b>{parts[0]}</b>"
-    return Paragraph(text, style)
+    # Shallow-copy the cached instance: the parsed frags are shared, but each
+    # cell gets its own object so Table.wrap() state can't bleed between
+    # cells of different widths or concurrent PDF builds
+    return copy.copy(_cell_paragraph(text, style))
 
 def create_seating_pdf(filename="algo/pdf_gen/seat_plan_generated/seating_plan.pdf", data=None, user_id: str = 'system', template_name: str = 'default', room_no: str = None):
     """Generate PDF using user's specific template or fallback to default"""
@@ -200,7 +341,7 @@ def create_seating_pdf(filename="algo/pdf_gen/seat_plan_generated/seating_plan.p
     # Load user's template configuration or use defaults
     if template_manager:
         template_config = template_manager.get_user_template(user_id, template_name)
-        print(f"📋 Using template for user {user_id}: {template_config.get('dept_name', 'Default')}")
+        logger.debug("📋 Using template for user %s: %s", user_id, template_config.get('dept_name', 'Default'))
     else:
         # Fallback template config (no room_number field)
         template_config = {
@@ -234,7 +375,7 @@ def create_seating_pdf(filename="algo/pdf_gen/seat_plan_generated/seating_plan.p
             if not os.path.isabs(candidate):
                 candidate = os.path.join(PDF_GEN_DIR, candidate)
             
-            if os.path.exists(candidate) and os.path.isfile(candidate):
+            if _is_regular_file(candidate):
                 resolved_path = candidate
         
         # 2. Fallback to system default if storage check failed
@@ -242,8 +383,11 @@ def create_seating_pdf(filename="algo/pdf_gen/seat_plan_generated/seating_plan.p
             resolved_path = IMAGE_PATH
             
         try:
-            if resolved_path and os.path.exists(resolved_path) and os.path.isfile(resolved_path):
-                c.drawImage(resolved_path,
+            if resolved_path and _is_regular_file(resolved_path):
+                reader = _IMAGE_READER_CACHE.get(resolved_path)
+                if reader is None:
+                    reader = _IMAGE_READER_CACHE.setdefault(resolved_path, ImageReader(resolved_path))
+                c.drawImage(reader,
                             x=doc.leftMargin,
                             y=page_height - doc.topMargin - 0.3 * cm,
                             width=CONTENT_WIDTH,
@@ -252,7 +396,7 @@ def create_seating_pdf(filename="algo/pdf_gen/seat_plan_generated/seating_plan.p
             else:
                 raise FileNotFoundError(f"Banner file not found: {resolved_path}")
         except Exception as e:
-            print(f"⚠️ PDF Header Error: {e}")
+            logger.warning("⚠️ PDF Header Error: %s", e)
             c.setFont('Helvetica-Bold', 12)
             c.drawCentredString(page_width / 2, page_height - doc.topMargin + 1.2 * cm,
                                 f"Header image missing")
@@ -314,21 +458,17 @@ def create_seating_pdf(filename="algo/pdf_gen/seat_plan_generated/seating_plan.p
     # Build aisle_positions: columns AFTER which an aisle appears (0-indexed)
     aisle_after_cols = []
     if block_structure and isinstance(block_structure, list) and len(block_structure) > 0:
-        # Variable block widths: calculate cumulative positions
-        import math
-        cumulative = 0
-        for i, width in enumerate(block_structure[:-1]):  # All but last block
-            cumulative += width
-            aisle_after_cols.append(cumulative - 1)  # 0-indexed column
+        # Variable block widths: cumulative block ends in one C-level pass;
+        # aisles sit after the last column of every block but the final one
+        ends = list(accumulate(block_structure))
+        aisle_after_cols = [e - 1 for e in ends[:-1]]  # 0-indexed columns
         num_blocks = len(block_structure)
         # Build block ranges for headers/styling: [(start, end), ...]
-        block_ranges = []
-        col_start = 0
-        for width in block_structure:
-            col_end = min(col_start + width - 1, num_cols - 1)
-            if col_start < num_cols:
-                block_ranges.append((col_start, col_end))
-            col_start += width
+        block_ranges = [
+            (start, min(end - 1, num_cols - 1))
+            for start, end in zip([0] + ends[:-1], ends)
+            if start < num_cols
+        ]
     elif block_width and block_width > 0 and num_cols > 0:
         # Uniform block_width: calculate standard aisle positions
         import math
@@ -344,7 +484,7 @@ def create_seating_pdf(filename="algo/pdf_gen/seat_plan_generated/seating_plan.p
         num_blocks = metadata.get('blocks', 1)
         block_ranges = [(0, num_cols - 1)]
     
-    print(f"📊 PDF Generation - Cols: {num_cols}, Block Structure: {block_structure}, Num Blocks: {num_blocks}")
+    logger.debug("📊 PDF Generation - Cols: %s, Block Structure: %s, Num Blocks: %s", num_cols, block_structure, num_blocks)
 
     # -- Dynamic page width & cell L/R padding ---------------------------
     # <= 14 cols : default page, default padding (3 pt each side)
@@ -364,7 +504,7 @@ def create_seating_pdf(filename="algo/pdf_gen/seat_plan_generated/seating_plan.p
     else:
         dynamic_page_size = (_DEF_W, _DEF_H)
         lr_padding = 1
-    print(f"📄 Page: {dynamic_page_size[0]/mm:.0f}x{dynamic_page_size[1]/mm:.0f}mm  L/R padding: {lr_padding}pt")
+    logger.debug("📄 Page: %.0fx%.0fmm  L/R padding: %dpt", dynamic_page_size[0]/mm, dynamic_page_size[1]/mm, lr_padding)
     # --------------------------------------------------------------------
 
     doc = SimpleDocTemplate(
@@ -376,42 +516,21 @@ def create_seating_pdf(filename="algo/pdf_gen/seat_plan_generated/seating_plan.p
         rightMargin=1.5 * cm
     )
     story = []
-    styles = getSampleStyleSheet()
-
-    cell_style = styles['Normal'].clone('Cell')
-    cell_style.fontSize = 9
-    cell_style.alignment = 1
-    cell_style.leading = 12
-    cell_style.fontName = 'Helvetica-Bold'
-
-    header_style = styles['Normal'].clone('Header')
-    header_style.fontSize = 12
-    header_style.alignment = 1
-    header_style.fontName = 'Helvetica-Bold'
+    cell_style = _CELL_STYLE
+    header_style = _HEADER_STYLE
 
     story.append(Spacer(0, 0.2 * cm))
-    
+
     # Use template values
-    dept_style = styles['Normal'].clone('Dept')
-    dept_style.fontSize = 13
-    dept_style.alignment = 1
-    story.append(Paragraph(f"<b>{template_config.get('dept_name')}</b>", dept_style))
-    
+    story.append(Paragraph(f"<b>{template_config.get('dept_name')}</b>", _DEPT_STYLE))
+
     story.append(Spacer(0, 0.15 * cm))
-    exam_style = styles['Normal'].clone('Exam')
-    exam_style.fontSize = 12
-    exam_style.alignment = 1
-    story.append(Paragraph(template_config.get('exam_details'), exam_style))
-    
-    title_style = styles['Heading4'].clone('Title')
-    title_style.alignment = 1
-    title_style.fontSize = 18
-    story.append(Paragraph(f"<b>{template_config.get('seating_plan_title')}</b>", title_style))
-
-    br_style = styles['Normal'].clone('BR')
-    br_style.fontSize = 12
-    br_style.fontName = 'Helvetica-Bold'
-    
+    story.append(Paragraph(template_config.get('exam_details'), _EXAM_STYLE))
+
+    story.append(Paragraph(f"<b>{template_config.get('seating_plan_title')}</b>", _TITLE_STYLE))
+
+    br_style = _BR_STYLE
+
     # Construct dynamic branch text from cache data with year grouping
     # Get current year from template (default to current year if not set)
     from datetime import datetime
@@ -551,15 +670,28 @@ def create_seating_pdf(filename="algo/pdf_gen/seat_plan_generated/seating_plan.p
             # Outer box for the entire table
             style_cmds.append(('BOX', (0, 0), (-1, -1), 3.0, colors.black))
 
-        # Apply cell background colors
+        # Apply cell background colors. TableStyle commands are evaluated per
+        # cell during layout, so adjacent cells sharing a color are coalesced
+        # into one spanning BACKGROUND command per run — batch color banding
+        # collapses a command per cell into a command per run.
+        def _flush_bg_run(start_col, end_col, r_idx, bg):
+            if bg:
+                try:
+                    style_cmds.append(('BACKGROUND', (start_col, r_idx), (end_col, r_idx), colors.HexColor(bg)))
+                except Exception:
+                    pass  # Skip invalid colors
+
         for r_idx, row in enumerate(seating_matrix, start=1):
+            run_start = 0
+            run_bg = row[0].get('bg') if row else None
             for c_idx, cell in enumerate(row):
                 bg = cell.get('bg')
-                if bg:
-                    try:
-                        style_cmds.append(('BACKGROUND', (c_idx, r_idx), (c_idx, r_idx), colors.HexColor(bg)))
-                    except Exception:
-                        pass  # Skip invalid colors
+                if bg != run_bg:
+                    _flush_bg_run(run_start, c_idx - 1, r_idx, run_bg)
+                    run_start = c_idx
+                    run_bg = bg
+            if row:
+                _flush_bg_run(run_start, len(row) - 1, r_idx, run_bg)
 
         table.setStyle(TableStyle(style_cmds))
         
@@ -570,7 +702,7 @@ def create_seating_pdf(filename="algo/pdf_gen/seat_plan_generated/seating_plan.p
         story.append(table)
 
     doc.build(story, onFirstPage=header_and_footer, onLaterPages=header_and_footer)
-    print(f"✅ PDF generated: {filename}")
+    logger.debug("✅ PDF generated: %s", filename)
     return filename
 
 
@@ -583,8 +715,9 @@ def generate_seating_pdf_to_buffer(
     """
     Generate a seating-plan PDF entirely in memory and return a BytesIO buffer.
 
-    Bypasses the L2 disk cache completely — every call produces a fresh PDF
-    that is streamed directly to the caller without touching the filesystem.
+    Never touches the L2 disk cache; repeat payloads are served from the
+    in-process bytes cache and everything else is generated fresh and
+    streamed to the caller without touching the filesystem.
 
     Args:
         data:          Seating payload (same shape accepted by create_seating_pdf).
@@ -600,17 +733,14 @@ def generate_seating_pdf_to_buffer(
 
     # Extract room_no from payload when not explicitly supplied
     if room_no is None:
-        if 'metadata' in data and 'room_no' in data['metadata']:
-            room_no = data['metadata']['room_no']
-        elif 'seating' in data:
-            for _row in data['seating']:
-                for _seat in _row:
-                    if _seat and not _seat.get('is_broken') and not _seat.get('is_unallocated'):
-                        room_no = _seat.get('room_no')
-                        if room_no:
-                            break
-                if room_no:
-                    break
+        room_no = _extract_room_no(data)
+
+    # room_no joins the key because an explicit override changes the output
+    # without changing the payload digest
+    cache_key = (seating_payload_digest(data, user_id, template_name), room_no)
+    cached = _pdf_cache_get(cache_key)
+    if cached is not None:
+        return io.BytesIO(cached)
 
     buffer = io.BytesIO()
     # ReportLab's SimpleDocTemplate accepts any file-like object as first argument
@@ -621,6 +751,7 @@ def generate_seating_pdf_to_buffer(
         template_name=template_name,
         room_no=room_no
     )
+    _pdf_cache_put(cache_key, buffer.getvalue())
     buffer.seek(0)
     return buffer
     
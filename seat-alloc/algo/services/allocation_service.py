@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
 
 from algo.config.settings import Config
-from algo.database.queries.session_queries import SessionQueries
+from algo.database.queries.session_queries import SessionQueries, invalidate_session_cache
 from algo.database.queries.student_queries import StudentQueries
 from algo.database.queries.allocation_queries import AllocationQueries
 from algo.core.algorithm.seating import SeatingAlgorithm
@@ -119,25 +119,21 @@ class AllocationService:
         # - batch_student_counts: {1: 30, 2: 25}
         # - batch_roll_numbers: {1: ["A1", "A2"], 2: ...} (Optional)
         
-        idx = 1
         algo_input_rolls = {}
-        
-        for batch_key, count in student_distribution.items():
+
+        # One pass over all_batches builds a name -> color map, so the loop
+        # below is a dict lookup per batch instead of a linear scan per batch
+        color_by_name = {b['batch_name']: b['color'] for b in all_batches}
+
+        for idx, (batch_key, count) in enumerate(student_distribution.items(), start=1):
              # batch_key could be batch name
-             # Find batch details
-             # We need color and name
-             matching_batch = next((b for b in all_batches if b['batch_name'] == batch_key), None)
-             color = matching_batch['color'] if matching_batch else "#CCCCCC"
-             
              batch_map[idx] = batch_key
              batch_counts[idx] = count
-             batch_colors[idx] = color
+             batch_colors[idx] = color_by_name.get(batch_key, "#CCCCCC")
              batch_labels[idx] = batch_key
-             
+
              if student_roll_numbers and batch_key in student_roll_numbers:
                  algo_input_rolls[idx] = student_roll_numbers[batch_key]
-                 
-             idx += 1
         
         # Get block_structure from classroom (auto-converted on read)
         block_structure = classroom.get('block_structure')
@@ -378,6 +374,7 @@ class AllocationService:
                     pass
             
             db.commit()
+            invalidate_session_cache()
             
             logger.info(f"Undid allocation for {classroom_name} ({deleted} students)")
             
@@ -506,6 +503,7 @@ class AllocationService:
                 pass  # allocation_history table might not exist
             
             db.commit()
+            invalidate_session_cache()
             
             # Get fresh totals
             cursor = db.execute("""
@@ -46,10 +46,14 @@ VALID_ROLES_LOWERCASE = ['developer', 'admin', 'faculty']
 DEFAULT_ROLE = 'faculty'
 
 def _get_conn():
-    """Get a standalone connection to the consolidated database."""
-    conn = sqlite3.connect(str(Config.DB_PATH), timeout=20)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get a pooled connection to the consolidated database.
+
+    token_required calls this on every authenticated request, so it reuses
+    the per-thread pooled connection instead of paying sqlite3.connect each
+    time; close() on it just rolls back and returns it to the pool.
+    """
+    from algo.database.db import get_db_connection
+    return get_db_connection()
 
 # ============================================================================
 # ADMIN EMAIL LIST (Optional: auto-assign developer role to these emails)
@@ -92,24 +96,46 @@ def _consume_pending_google_signup(signup_token: str) -> Optional[Dict]:
         return None
     return payload
 
+# Verified token payloads, keyed by the raw token string. A hit skips the
+# base64 decode + HMAC check on every authenticated request; entries are
+# dropped once their own exp claim passes, so no separate pruning thread.
+_TOKEN_CACHE_MAX = 4096
+_token_payload_cache = {}
+
+
+def _verify_token_cached(token: str) -> Optional[Dict]:
+    """verify_token with a bounded in-memory cache on the raw token string."""
+    payload = _token_payload_cache.get(token)
+    if payload is not None:
+        if payload.get('exp', 0) > time.time():
+            return payload
+        _token_payload_cache.pop(token, None)
+        return None
+
+    payload = verify_token(token)
+    if payload:
+        if len(_token_payload_cache) >= _TOKEN_CACHE_MAX:
+            _token_payload_cache.clear()
+        _token_payload_cache[token] = payload
+    return payload
+
+
 def token_required(f):
     """Decorator to require valid JWT token"""
     from functools import wraps
     from flask import request, jsonify
-    
+
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(" ")[1]
-        
+        # Single header lookup + slice instead of contains/index/startswith/split
+        auth_header = request.headers.get('Authorization', '')
+        token = auth_header[7:] if auth_header.startswith('Bearer ') else None
+
         if not token:
             return jsonify({'message': 'Token is missing!'}), 401
-            
+
         try:
-            payload = verify_token(token)
+            payload = _verify_token_cached(token)
             if not payload:
                 return jsonify({'message': 'Token is invalid or expired!'}), 401
 
@@ -120,9 +146,11 @@ def token_required(f):
             db_user = get_user_by_id(user_id) if user_id else None
             resolved_role = _normalize_role(db_user.get('role')) if db_user else _normalize_role(token_role)
 
-            # Set user info on request object
+            # Set user info on request object; request.token saves routes
+            # from re-parsing the Authorization header themselves
             request.user_id = user_id
             request.user_role = resolved_role
+            request.token = token
         except Exception as e:
             return jsonify({'message': f'Error verifying token: {str(e)}'}), 401
             
@@ -371,34 +399,51 @@ def login(email: str, password: str) -> Tuple[bool, Optional[Dict], str]:
     else:
         return False, "Invalid email or password.", ""
 
-def update_user_profile(user_id: int, username: str = None, email: str = None) -> Tuple[bool, str]:
-    """Update user profile (username and email only)"""
+def update_user_profile(user_id: int, username: str = None, email: str = None) -> Tuple[bool, str, Optional[Dict]]:
+    """Update user profile (username and email only).
+
+    Returns (ok, message, user) — RETURNING hands back the updated row in
+    the same statement, so callers don't need a follow-up SELECT.
+    """
     updates = []
     params = []
-    
+
     if username:
         updates.append("username = ?")
         params.append(username)
     if email:
         updates.append("email = ?")
         params.append(email)
-        
-    if not updates: 
-        return False, "No data provided."
-    
+
+    if not updates:
+        return False, "No data provided.", None
+
     # Add updated_at timestamp
     updates.append("updated_at = CURRENT_TIMESTAMP")
-    query = f"UPDATE users SET {', '.join(updates)} WHERE id = ?"
+    query = (
+        f"UPDATE users SET {', '.join(updates)} WHERE id = ? "
+        "RETURNING id, username, email, role, full_name, auth_provider"
+    )
     params.append(user_id)
-    
+
     try:
         conn = _get_conn()
-        conn.execute(query, tuple(params))
+        row = conn.execute(query, tuple(params)).fetchone()
         conn.commit()
         conn.close()
-        return True, "Profile updated successfully."
+        if row is None:
+            return False, "User not found.", None
+        user = {
+            "id": row["id"],
+            "username": row["username"],
+            "email": row["email"],
+            "role": row["role"],
+            "fullName": row["full_name"],
+            "auth_provider": row["auth_provider"]
+        }
+        return True, "Profile updated successfully.", user
     except sqlite3.Error as e:
-        return False, f"Update failed: {str(e)}"
+        return False, f"Update failed: {str(e)}", None
 
 # ============================================================================
 # GOOGLE OAUTH (WITH ADMIN ROLE SUPPORT)
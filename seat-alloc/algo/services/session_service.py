@@ -4,7 +4,7 @@ import logging
 import uuid
 import datetime
 from typing import Dict, List, Optional, Tuple
-from algo.database.queries.session_queries import SessionQueries
+from algo.database.queries.session_queries import SessionQueries, invalidate_session_cache
 from algo.database.queries.allocation_queries import AllocationQueries
 from algo.database.queries.student_queries import StudentQueries
 
@@ -40,14 +40,9 @@ class SessionService:
     def create_session(name: Optional[str], user_id: int) -> Dict:
         """Create a new session, returning the session object."""
         plan_id = str(uuid.uuid4())
-        session_id = SessionQueries.create_session(plan_id, user_id, name)
-        logger.info(f"Created session {session_id} with plan_id {plan_id}")
-        return {
-            'session_id': session_id,
-            'plan_id': plan_id,
-            'user_id': user_id,
-            'name': name
-        }
+        session = SessionQueries.create_session(plan_id, user_id, name)
+        logger.info(f"Created session {session['session_id']} with plan_id {plan_id}")
+        return session
 
     @staticmethod
     def get_session(session_id: int) -> Optional[Dict]:
@@ -259,6 +254,7 @@ class SessionService:
             
             expired_count = cursor.rowcount
             db.commit()
+            invalidate_session_cache()
             
             if expired_count > 0:
                 logger.info(f"⏰ Auto-expired {expired_count} stale session(s) (inactive > {threshold_minutes} min)")
@@ -423,6 +419,7 @@ class SessionService:
                         UPDATE allocation_sessions SET status = 'expired' WHERE session_id = ?
                     """, (existing_id,))
                     db.commit()
+                    invalidate_session_cache()
                     # Continue to create new session
                 else:
                     # Add uploads to existing session
@@ -457,6 +454,7 @@ class SessionService:
                     """, (new_total, current_allocated, user_id, existing_id))
                     
                     db.commit()
+                    invalidate_session_cache()
                     
                     # Get allocated rooms
                     allocated_rooms = AllocationQueries.get_allocated_rooms(existing_id)
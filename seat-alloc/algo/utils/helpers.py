@@ -1,14 +1,16 @@
 # General utility functions and helper methods used across the backend application.
-import json
-from typing import Dict, Any, Optional
+import orjson
+from typing import Dict, Any
 
 def parse_int_dict(val: Any) -> Dict[int, int]:
     """Parse a value into Dict[int, int]."""
     if isinstance(val, dict):
         return {int(k): int(v) for k, v in val.items()}
-    if isinstance(val, str) and val:
+    if isinstance(val, (str, bytes)) and val:
         try:
-            return json.loads(val)
+            # orjson decodes in native code; keys come back as str and are
+            # normalized here so both input paths yield int-keyed dicts
+            return {int(k): int(v) for k, v in orjson.loads(val).items()}
         except Exception:
             pass
     return {}
@@ -17,9 +19,9 @@ def parse_str_dict(val: Any) -> Dict[int, str]:
     """Parse a value into Dict[int, str]."""
     if isinstance(val, dict):
         return {int(k): str(v) for k, v in val.items()}
-    if isinstance(val, str) and val:
+    if isinstance(val, (str, bytes)) and val:
         try:
-            return json.loads(val)
+            return {int(k): str(v) for k, v in orjson.loads(val).items()}
         except Exception:
             pass
     return {}
@@ -236,17 +236,16 @@ class StudentDataParser:
             except Exception:
                 pass
 
-            # Detect format from magic bytes
+            # Detect format from magic bytes.
+            # The upload is already a seekable SpooledTemporaryFile — hand the
+            # stream straight to pandas instead of read()-ing it into memory
+            # and re-wrapping in BytesIO (which doubled peak memory per upload)
             if isinstance(head, (bytes, bytearray)):
                 # Excel formats
                 if head.startswith(b"PK\x03\x04") or head.startswith(b"\xD0\xCF\x11\xE0"):
                     try:
-                        content = file_input.read()
-                        if not isinstance(content, (bytes, bytearray)):
-                            content = str(content).encode("utf-8")
-                        df = pd.read_excel(
-                            io.BytesIO(content), dtype=str, keep_default_na=False
-                        )
+                        file_input.seek(0)
+                        df = pd.read_excel(file_input, dtype=str, keep_default_na=False)
                         logger.info("Detected Excel format from file-like object")
                         return df
                     except Exception as e:
@@ -256,33 +255,21 @@ class StudentDataParser:
                             pass
                         raise ValueError(f"Failed to read Excel from upload: {str(e)}")
 
-                # CSV format
-                content = file_input.read()
-                try:
-                    file_input.seek(0)
-                except Exception:
-                    pass
-                
-                if isinstance(content, (bytes, bytearray)):
-                    for enc in ("utf-8", "latin-1", "cp1252"):
-                        try:
-                            text = content.decode(enc)
-                            df = pd.read_csv(
-                                io.StringIO(text),
-                                dtype=str,
-                                keep_default_na=False,
-                            )
-                            logger.info(f"Read CSV from file-like with {enc}")
-                            return df
-                        except Exception:
-                            continue
-                else:
-                    # Already text
-                    df = pd.read_csv(
-                        io.StringIO(str(content)), dtype=str, keep_default_na=False
-                    )
-                    logger.info("Read CSV from text content")
-                    return df
+                # CSV format — retry encodings by seeking back, not by keeping
+                # the whole payload in a Python bytes object
+                for enc in ("utf-8", "latin-1", "cp1252"):
+                    try:
+                        file_input.seek(0)
+                        df = pd.read_csv(
+                            file_input,
+                            dtype=str,
+                            keep_default_na=False,
+                            encoding=enc,
+                        )
+                        logger.info(f"Read CSV from file-like with {enc}")
+                        return df
+                    except Exception:
+                        continue
 
                 # Final fallback: try Excel
                 try:
@@ -9,6 +9,7 @@ Tests the major API blueprints through the Flask test client:
 - Dashboard (user-scoped stats)
 - Allocations (generate seating)
 - Plans (listing)
+- Feedback (submit, bulk, delete, attachment ACL, conditional GET)
 """
 import pytest
 import json
@@ -291,6 +292,192 @@ class TestFeedback:
         assert resp.status_code == 200
 
 
+def _submit_feedback(client, token, description="Automated test feedback", file=None):
+    """Submit one feedback item via the API; returns the response."""
+    data = {
+        "issueType": "bug",
+        "priority": "medium",
+        "description": description,
+    }
+    if file is not None:
+        data["file"] = file
+    return client.post("/api/feedback", data=data,
+                       headers=_auth_header(token),
+                       content_type="multipart/form-data")
+
+
+class TestFeedbackBulk:
+    """POST /api/feedback/bulk inserts many items in one transaction."""
+
+    def test_bulk_submit_count(self, client, user_a):
+        """A valid batch returns 201 with the inserted count."""
+        items = [
+            {"issueType": "bug", "priority": "high", "description": f"Bulk item {i}"}
+            for i in range(3)
+        ]
+        resp = client.post("/api/feedback/bulk", json={"items": items},
+                           headers=_auth_header(user_a["token"]))
+        assert resp.status_code == 201
+        assert resp.get_json().get("count") == 3
+
+        listing = client.get("/api/feedback",
+                             headers=_auth_header(user_a["token"])).get_json()
+        assert len(listing["feedback"]) == 3
+
+    def test_bulk_rejects_invalid_item(self, client, user_a):
+        """An item missing required fields fails the whole batch with 400."""
+        items = [
+            {"issueType": "bug", "priority": "high", "description": "ok"},
+            {"issueType": "bug", "priority": "high"},  # no description
+        ]
+        resp = client.post("/api/feedback/bulk", json={"items": items},
+                           headers=_auth_header(user_a["token"]))
+        assert resp.status_code == 400
+        assert "Item 1" in resp.get_json().get("error", "")
+
+        listing = client.get("/api/feedback",
+                             headers=_auth_header(user_a["token"])).get_json()
+        assert listing["feedback"] == []
+
+    def test_bulk_rejects_empty_batch(self, client, user_a):
+        """An empty or missing items array returns 400."""
+        resp = client.post("/api/feedback/bulk", json={"items": []},
+                           headers=_auth_header(user_a["token"]))
+        assert resp.status_code == 400
+
+
+class TestFeedbackDelete:
+    """DELETE /api/feedback/<id> is admin-only and removes the attachment."""
+
+    def test_delete_requires_admin(self, client, user_a, user_b):
+        """A non-admin caller gets 403 and the row survives."""
+        _submit_feedback(client, user_b["token"])
+        listing = client.get("/api/feedback",
+                             headers=_auth_header(user_b["token"])).get_json()
+        feedback_id = listing["feedback"][0]["id"]
+
+        resp = client.delete(f"/api/feedback/{feedback_id}",
+                             headers=_auth_header(user_b["token"]))
+        assert resp.status_code == 403
+
+        listing = client.get("/api/feedback",
+                             headers=_auth_header(user_b["token"])).get_json()
+        assert len(listing["feedback"]) == 1
+
+    def test_admin_delete_removes_row_and_file(self, client, user_a, user_b, tmp_path):
+        """An admin delete returns 200 and the attached file is unlinked."""
+        import io
+        import time
+
+        client.application.config["FEEDBACK_FOLDER"] = tmp_path
+        _submit_feedback(client, user_b["token"],
+                         file=(io.BytesIO(b"traceback contents"), "error.log"))
+
+        listing = client.get("/api/feedback",
+                             headers=_auth_header(user_b["token"])).get_json()
+        feedback_id = listing["feedback"][0]["id"]
+        attached = list(tmp_path.rglob("*error.log"))
+        assert len(attached) == 1
+
+        resp = client.delete(f"/api/feedback/{feedback_id}",
+                             headers=_auth_header(user_a["token"]))
+        assert resp.status_code == 200
+
+        listing = client.get("/api/feedback",
+                             headers=_auth_header(user_b["token"])).get_json()
+        assert listing["feedback"] == []
+
+        # File removal is queued on a background thread — poll briefly
+        deadline = time.time() + 2
+        while attached[0].exists() and time.time() < deadline:
+            time.sleep(0.05)
+        assert not attached[0].exists()
+
+    def test_delete_unknown_id(self, client, user_a):
+        """Deleting a non-existent id returns 404."""
+        resp = client.delete("/api/feedback/99999",
+                             headers=_auth_header(user_a["token"]))
+        assert resp.status_code == 404
+
+
+class TestFeedbackFileDownload:
+    """GET /api/feedback/<id>/file enforces owner-or-admin access."""
+
+    def _attach_and_get_id(self, client, user, tmp_path):
+        import io
+        client.application.config["FEEDBACK_FOLDER"] = tmp_path
+        _submit_feedback(client, user["token"],
+                         file=(io.BytesIO(b"attachment body"), "notes.txt"))
+        listing = client.get("/api/feedback",
+                             headers=_auth_header(user["token"])).get_json()
+        return listing["feedback"][0]["id"]
+
+    def test_owner_can_download(self, client, user_b, tmp_path):
+        """The submitting user can fetch their own attachment."""
+        feedback_id = self._attach_and_get_id(client, user_b, tmp_path)
+        resp = client.get(f"/api/feedback/{feedback_id}/file",
+                          headers=_auth_header(user_b["token"]))
+        assert resp.status_code == 200
+        assert resp.data == b"attachment body"
+
+    def test_other_user_denied(self, client, user_b, user_c, tmp_path):
+        """A different non-admin user gets 403."""
+        feedback_id = self._attach_and_get_id(client, user_b, tmp_path)
+        resp = client.get(f"/api/feedback/{feedback_id}/file",
+                          headers=_auth_header(user_c["token"]))
+        assert resp.status_code == 403
+
+    def test_admin_can_download(self, client, user_a, user_b, tmp_path):
+        """An admin can fetch any user's attachment."""
+        feedback_id = self._attach_and_get_id(client, user_b, tmp_path)
+        resp = client.get(f"/api/feedback/{feedback_id}/file",
+                          headers=_auth_header(user_a["token"]))
+        assert resp.status_code == 200
+
+    def test_missing_attachment_404(self, client, user_b):
+        """Feedback without a file returns 404 from the download route."""
+        _submit_feedback(client, user_b["token"])
+        listing = client.get("/api/feedback",
+                             headers=_auth_header(user_b["token"])).get_json()
+        feedback_id = listing["feedback"][0]["id"]
+        resp = client.get(f"/api/feedback/{feedback_id}/file",
+                          headers=_auth_header(user_b["token"]))
+        assert resp.status_code == 404
+
+
+class TestFeedbackETag:
+    """Conditional GET on /api/feedback: 304 on match, refreshed by writes."""
+
+    def test_etag_round_trip(self, client, user_a):
+        """A matching If-None-Match returns 304 with no body."""
+        _submit_feedback(client, user_a["token"])
+        first = client.get("/api/feedback",
+                           headers=_auth_header(user_a["token"]))
+        etag = first.headers.get("ETag")
+        assert etag
+
+        second = client.get("/api/feedback",
+                            headers={**_auth_header(user_a["token"]),
+                                     "If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.data == b""
+
+    def test_write_invalidates_etag(self, client, user_a):
+        """A new submission must change the validator — no stale 304."""
+        _submit_feedback(client, user_a["token"], description="first")
+        first = client.get("/api/feedback",
+                           headers=_auth_header(user_a["token"]))
+        etag = first.headers.get("ETag")
+
+        _submit_feedback(client, user_a["token"], description="second")
+        resp = client.get("/api/feedback",
+                          headers={**_auth_header(user_a["token"]),
+                                   "If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers.get("ETag") != etag
+        assert len(resp.get_json()["feedback"]) == 2
+
+
 # ============================================================================
 # ERROR HANDLING
 # ============================================================================